@@ -4,9 +4,13 @@ from typing import Optional
 import arcade
 import pymunk
 
+from abbot import physics, settings, trace
+from abbot.gravity import GravityField
 from abbot.math import distance
-from abbot.npc import Collision, NPC, ATTACK_DISTANCE
-from abbot.galaxy import Chunk, Galaxy
+from abbot.npc import NPC, NPCPopulation, ATTACK_DISTANCE
+from abbot.profiling import FrameProfiler
+from abbot.replay import DEFAULT_HASH_INTERVAL, ReplayRecorder
+from abbot.galaxy import Chunk, ChunkPrefetcher, Galaxy
 
 # Movement speed of player, in pixels per frame
 MOVEMENT_SPEED = 2
@@ -15,108 +19,252 @@ PLAYER_JUMP_SPEED = 25
 PLAYER_MOVE_FORCE_ON_GROUND = 1000
 
 
+def create_galaxy(seed=None):
+    """ Return a Galaxy configured from settings """
+    return Galaxy(
+        seed,
+        store_directory=settings.CHUNK_STORE_PATH,
+        physics_radius=settings.PHYSICS_CHUNK_RADIUS,
+        far_field_radius=settings.FAR_FIELD_CHUNK_RADIUS,
+    )
+
+
 class Driver:
-    def __init__(self):
+    def __init__(self, seed=None, galaxy=None, prefetch=None, player=None):
+        """Build a fresh simulation in a new galaxy from seed, or in galaxy,
+        e.g. one whose modified chunks were restored from a snapshot, with a
+        new player or the given one, whose position the first active chunks
+        are around. prefetch overrides settings.PREFETCH_CHUNKS, e.g. to keep
+        worker threads out of benchmarks.
+        """
         # Set up the player, specifically placing it at these coordinates.
-        self.player = NPC("kingkrool", hp=100)
+        self.player = player if player is not None else NPC("kingkrool", hp=100)
+        self.npcs = NPCPopulation()
 
         self.moving_left = False
         self.moving_right = False
 
         self.do_attack = False
-        self.galaxy = Galaxy()
+        self.do_jump = False
+        self.ticks = 0
+        self.recorder = None
+        self.profiler = FrameProfiler() if settings.PROFILE_FRAMES else None
+        self.galaxy = galaxy if galaxy is not None else create_galaxy(seed)
+        self.prefetcher = (
+            ChunkPrefetcher(
+                self.galaxy,
+                look_ahead_ring=settings.PREFETCH_LOOK_AHEAD_RING,
+                integration_budget=settings.PREFETCH_INTEGRATION_BUDGET,
+                integration_delay=settings.PREFETCH_INTEGRATION_DELAY,
+            )
+            if (settings.PREFETCH_CHUNKS if prefetch is None else prefetch)
+            else None
+        )
+
+        self.gravity_field = (
+            GravityField(theta=settings.GRAVITY_FIELD_THETA)
+            if settings.GRAVITY_FIELD
+            else None
+        )
 
         # Physics
         def handle_collision_begin(arbiter, space, data):
-            if hasattr(arbiter.shapes[0], "npc"):
-                self.handle_npc_collision_begin(
-                    arbiter, space, data, arbiter.shapes[0].npc, arbiter.shapes[1]
-                )
-            if hasattr(arbiter.shapes[1], "npc"):
-                self.handle_npc_collision_begin(
-                    arbiter, space, data, arbiter.shapes[1].npc, arbiter.shapes[0]
-                )
+            npc_shape, shape = arbiter.shapes
+            self.handle_npc_collision_begin(arbiter, space, data, npc_shape.npc, shape)
             return True
 
         def handle_collision_separate(arbiter, space, data):
-            if hasattr(arbiter.shapes[0], "npc"):
-                self.handle_npc_collision_separate(
-                    arbiter, space, data, arbiter.shapes[0].npc, arbiter.shapes[1]
-                )
-            if hasattr(arbiter.shapes[1], "npc"):
-                self.handle_npc_collision_separate(
-                    arbiter, space, data, arbiter.shapes[1].npc, arbiter.shapes[0]
-                )
+            npc_shape, shape = arbiter.shapes
+            self.handle_npc_collision_separate(
+                arbiter, space, data, npc_shape.npc, shape
+            )
+
+        def handle_mutual_collision_begin(arbiter, space, data):
+            first_shape, second_shape = arbiter.shapes
+            self.handle_npc_collision_begin(
+                arbiter, space, data, first_shape.npc, second_shape
+            )
+            self.handle_npc_collision_begin(
+                arbiter, space, data, second_shape.npc, first_shape
+            )
+            return True
+
+        def handle_mutual_collision_separate(arbiter, space, data):
+            first_shape, second_shape = arbiter.shapes
+            self.handle_npc_collision_separate(
+                arbiter, space, data, first_shape.npc, second_shape
+            )
+            self.handle_npc_collision_separate(
+                arbiter, space, data, second_shape.npc, first_shape
+            )
 
         self.space = pymunk.Space()
+        physics.set_collision_type(self.player.shape, physics.PLAYER_COLLISION_TYPE)
         self.space.add(self.player.body, self.player.shape)
-        self.collision_handler = self.space.add_default_collision_handler()
-        self.collision_handler.begin = handle_collision_begin
-        self.collision_handler.separate = handle_collision_separate
+        self.celestial_body_shapes = physics.CelestialBodyShapePool(self.space)
+        # Only pairs with game logic get handlers. Pairs nobody cares about
+        # are either filtered out by shape filters, or use pymunk's default.
+        self.collision_handlers = []
+        for npc_collision_type in (
+            physics.PLAYER_COLLISION_TYPE,
+            physics.NPC_COLLISION_TYPE,
+        ):
+            collision_handler = self.space.add_collision_handler(
+                npc_collision_type, physics.CELESTIAL_BODY_COLLISION_TYPE
+            )
+            collision_handler.begin = handle_collision_begin
+            collision_handler.separate = handle_collision_separate
+            self.collision_handlers.append(collision_handler)
+        collision_handler = self.space.add_collision_handler(
+            physics.PLAYER_COLLISION_TYPE, physics.NPC_COLLISION_TYPE
+        )
+        collision_handler.begin = handle_mutual_collision_begin
+        collision_handler.separate = handle_mutual_collision_separate
+        self.collision_handlers.append(collision_handler)
         self.active_chunks = []
+        self._active_chunk_coordinates = set()
+        self._chunk_bindings = {}
         self.update_active_chunks()
 
     def update(self, delta_time):
         """ Movement and game logic """
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        if self.recorder:
+            self.recorder.record_inputs(self, delta_time)
+        if self.do_jump:
+            self.do_jump = False
+            self.player.jump()
         if self.moving_left:
             force = (-PLAYER_MOVE_FORCE_ON_GROUND, 0)
             self.player.body.apply_force_at_local_point(force, (0, 0))
         if self.moving_right:
             force = (PLAYER_MOVE_FORCE_ON_GROUND, 0)
             self.player.body.apply_force_at_local_point(force, (0, 0))
-        closest_celestial_body = self.galaxy.closest_celestial_body(
-            self.player.x, self.player.y
-        )
-        self.player.update(closest_celestial_body)
-
+        if profiler:
+            profiler.lap("input_forces")
+        # move the active chunks to the player before anything queries them
         self.update_active_chunks()
-        self.space.step(delta_time)
+        if profiler:
+            profiler.lap("update_active_chunks")
+        if self.gravity_field is not None:
+            self.player.update_animation()
+            self.player.apply_gravity(
+                *self.gravity_field.acceleration(self.player.x, self.player.y),
+                delta_time,
+            )
+            if profiler:
+                profiler.lap("gravity_field")
+        else:
+            closest_celestial_body = self.galaxy.closest_celestial_body(
+                self.player.x, self.player.y
+            )
+            if profiler:
+                profiler.lap("closest_celestial_body")
+            self.player.update(closest_celestial_body)
+        self.npcs.update(self.galaxy, self.gravity_field, delta_time)
+        if profiler:
+            profiler.lap("npc_update")
+        # attack before the step, while the proximity index built by the NPC
+        # update still matches body positions
         if self.do_attack:
             self.do_attack = False
-            self.player.attack([])
+            self.player.attack(self.npcs.proximity)
+            if profiler:
+                profiler.lap("attack")
+        self.space.step(delta_time)
+        if profiler:
+            profiler.lap("space_step")
+        self.ticks += 1
+        if self.recorder:
+            self.recorder.record_state(self)
+
+    def record(self, path, hash_interval=DEFAULT_HASH_INTERVAL):
+        """Record inputs of every update to a replay log at path, see
+        abbot.replay. Must start before the first update, since replays start
+        from a fresh Driver.
+        """
+        if self.recorder or self.ticks:
+            raise ValueError("Recording must start before the first update")
+        self.recorder = ReplayRecorder(path, self.galaxy.seed, hash_interval)
+
+    def add_npc(self, npc):
+        self.add_npcs([npc])
+
+    def add_npcs(self, npcs):
+        """ Add NPCs to the population and space, in one batch """
+        npcs = list(npcs)
+        self.npcs.extend(npcs)
+        bodies_and_shapes = []
+        for npc in npcs:
+            bodies_and_shapes.append(npc.body)
+            bodies_and_shapes.append(npc.shape)
+        self.space.add(*bodies_and_shapes)
 
     def update_active_chunks(self):
-        last_active_chunks = self.active_chunks or []
-        self.active_chunks = list(
-            self.galaxy.position_to_active_chunks(self.player.x, self.player.y)
+        if self.prefetcher:
+            velocity = self.player.body.velocity
+            self.prefetcher.schedule(
+                self.player.x, self.player.y, velocity.x, velocity.y
+            )
+            for chunk in self.prefetcher.finished_chunks():
+                self.add_chunk_to_space(chunk)
+        last_active_chunks = self.active_chunks
+        active_chunks = self.galaxy.update_active_chunks(self.player.x, self.player.y)
+        activated = active_chunks is not last_active_chunks
+        if activated:
+            self.active_chunks = active_chunks
+            self._active_chunk_coordinates = {
+                (chunk.chunk_x, chunk.chunk_y) for chunk in active_chunks
+            }
+            if self.gravity_field is not None:
+                self.gravity_field.rebuild(*self.galaxy.celestial_body_arrays())
+        # every tick, since prefetched chunks stop being wanted as the
+        # player turns around, without the active chunks changing
+        self.remove_unwanted_chunks_from_space()
+        if activated:
+            for chunk in active_chunks:
+                self.add_chunk_to_space(chunk)
+
+    def remove_unwanted_chunks_from_space(self):
+        """ Unbind chunks neither active nor wanted by the prefetcher """
+        for chunk_coordinates, binding in list(self._chunk_bindings.items()):
+            if chunk_coordinates in self._active_chunk_coordinates:
+                continue
+            if self.prefetcher and self.prefetcher.wants(*chunk_coordinates):
+                continue
+            self.remove_chunk_from_space(binding.chunk)
+
+    def add_chunk_to_space(self, chunk):
+        """ Bind physics shapes to the chunk's celestial bodies """
+        chunk_coordinates = (chunk.chunk_x, chunk.chunk_y)
+        if chunk_coordinates in self._chunk_bindings:
+            return
+        self._chunk_bindings[chunk_coordinates] = physics.ChunkBinding(
+            chunk, self.celestial_body_shapes.add(chunk.celestial_bodies)
         )
-        # remove chunk sprites from engine
-        for last_active_chunk in last_active_chunks:
-            if not last_active_chunk in self.active_chunks:
-                for celestial_body in last_active_chunk.celestial_bodies:
-                    try:
-                        self.space.remove(celestial_body.shape, celestial_body.body)
-                        print(f"Removed celestial_body {celestial_body}")
-                    except:
-                        print(f"Error removing celestial body {celestial_body}")
-
-                print(f"Removed chunk {last_active_chunk}")
-        # add chunk sprites to engine
-        for active_chunk in self.active_chunks:
-            if not active_chunk in last_active_chunks:
-                for celestial_body in active_chunk.celestial_bodies:
-                    try:
-                        self.space.add(celestial_body.body, celestial_body.shape)
-                        print(f"Created celestial body {celestial_body}")
-                    except:
-                        print(
-                            f"Error, duplicate adding celestial body {celestial_body}"
-                        )
-
-                print(f"Added chunk {active_chunk}")
+        trace.event(trace.GALAXY, trace.INFO, "Added %s", chunk)
+
+    def remove_chunk_from_space(self, chunk):
+        binding = self._chunk_bindings.pop((chunk.chunk_x, chunk.chunk_y))
+        self.celestial_body_shapes.remove(binding.shapes)
+        trace.event(trace.GALAXY, trace.INFO, "Removed %s", chunk)
+
+    def close(self):
+        """Release background resources, e.g. chunk prefetch workers, and
+        write back dirty chunks.
+        """
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+        if self.recorder:
+            self.recorder.close()
+        self.galaxy.close()
 
     def handle_npc_collision_begin(self, arbiter, space, data, npc, shape):
-        print(f"NPC collision with shape")
-        npc.add_collision(
-            Collision(
-                normal=arbiter.normal,
-                total_impulse=arbiter.total_impulse,
-                shape=shape,
-                contact_point_set=arbiter.contact_point_set,
-                surface_velocity=arbiter.surface_velocity,
-            )
-        )
+        trace.event(trace.PHYSICS, trace.DEBUG, "NPC collision with %s", shape)
+        npc.add_collision(shape, arbiter.normal)
 
     def handle_npc_collision_separate(self, arbiter, space, data, npc, shape):
-        print(f"NPC separation with shape")
+        trace.event(trace.PHYSICS, trace.DEBUG, "NPC separation with %s", shape)
         npc.remove_collision(shape)
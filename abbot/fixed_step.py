@@ -0,0 +1,174 @@
+import math
+import threading
+import time
+
+import numpy
+
+from abbot import trace
+from abbot.npc import vectors_to_array
+
+FIXED_TIMESTEP = 1 / 60
+# Steps run per advance at most, before the rest of the backlog is dropped
+MAX_CATCH_UP_STEPS = 5
+
+
+def interpolate(previous, current, alpha):
+    return previous + (current - previous) * alpha
+
+
+def interpolate_angle(previous, current, alpha):
+    """ Interpolate between angles, in radians, the short way around """
+    difference = (current - previous + math.pi) % (2 * math.pi) - math.pi
+    return previous + difference * alpha
+
+
+class Snapshot:
+    """What the renderer needs of the simulation state after a tick. The
+    simulation publishes a new one every tick, so they are never mutated.
+    """
+
+    __slots__ = (
+        "tick",
+        "player_x",
+        "player_y",
+        "player_angle",
+        "player_hp",
+        "npcs",
+        "npc_xs",
+        "npc_ys",
+        "npc_angles",
+        "active_chunks",
+        "far_field_chunks",
+    )
+
+    def __init__(self, tick, driver):
+        player = driver.player
+        self.tick = tick
+        self.player_x = player.x
+        self.player_y = player.y
+        self.player_angle = player.angle
+        self.player_hp = player.current_hp
+        self.npcs = list(driver.npcs)
+        bodies = [npc.body for npc in self.npcs]
+        positions = vectors_to_array([body.position for body in bodies])
+        self.npc_xs = positions[:, 0]
+        self.npc_ys = positions[:, 1]
+        self.npc_angles = numpy.fromiter((body.angle for body in bodies), float)
+        self.active_chunks = driver.active_chunks
+        self.far_field_chunks = driver.galaxy.far_field_chunks
+
+    def interpolate_player(self, previous, alpha):
+        """ Return the player x, y and angle alpha of the way from previous """
+        return (
+            interpolate(previous.player_x, self.player_x, alpha),
+            interpolate(previous.player_y, self.player_y, alpha),
+            interpolate_angle(previous.player_angle, self.player_angle, alpha),
+        )
+
+    def interpolate_npcs(self, previous, alpha):
+        """Return NPC xs, ys and angles alpha of the way from previous, for
+        as many NPCs as both snapshots have, index aligned with npcs.
+        """
+        count = min(len(self.npc_xs), len(previous.npc_xs))
+        return (
+            interpolate(previous.npc_xs[:count], self.npc_xs[:count], alpha),
+            interpolate(previous.npc_ys[:count], self.npc_ys[:count], alpha),
+            interpolate_angle(
+                previous.npc_angles[:count], self.npc_angles[:count], alpha
+            ),
+        )
+
+
+class FixedStepSimulation:
+    """Step a Driver at a fixed timestep, however long frames take. Elapsed
+    time builds up in an accumulator that is spent in whole steps, at most
+    max_steps per advance, and any backlog beyond that is dropped, so a slow
+    frame slows the simulation down rather than sending it into a spiral of
+    ever more catch up steps.
+
+    After each step a Snapshot is published, and the renderer draws
+    snapshots() interpolated between the last two, so motion stays smooth at
+    any frame rate. advance may be called once a frame, or start() steps on
+    a thread of its own. Hold lock to change the driver from another thread,
+    e.g. input handlers.
+    """
+
+    def __init__(self, driver, timestep=FIXED_TIMESTEP, max_steps=MAX_CATCH_UP_STEPS):
+        self.driver = driver
+        self.timestep = timestep
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.tick = 0
+        self.lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        snapshot = Snapshot(self.tick, driver)
+        self._previous = self._current = snapshot
+        self._published_accumulator = 0
+        self._published_at = time.perf_counter()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def advance(self, elapsed):
+        """ Spend elapsed seconds on whole steps, return how many were run """
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator >= self.timestep and steps < self.max_steps:
+            with self.lock:
+                self.driver.update(self.timestep)
+                self.tick += 1
+                snapshot = Snapshot(self.tick, self.driver)
+            self.accumulator -= self.timestep
+            steps += 1
+            with self._snapshot_lock:
+                self._previous, self._current = self._current, snapshot
+        if self.accumulator >= self.timestep:
+            trace.event(
+                trace.PHYSICS,
+                trace.WARNING,
+                "Dropped %.3fs of simulation",
+                self.accumulator - self.accumulator % self.timestep,
+            )
+            self.accumulator %= self.timestep
+        if steps:
+            with self._snapshot_lock:
+                self._published_accumulator = self.accumulator
+                self._published_at = time.perf_counter()
+        return steps
+
+    def snapshots(self):
+        """Return the previous and current snapshots, and how far between
+        them, from 0 to 1, the present is.
+        """
+        with self._snapshot_lock:
+            since_published = time.perf_counter() - self._published_at
+            alpha = (self._published_accumulator + since_published) / self.timestep
+            return self._previous, self._current, min(alpha, 1)
+
+    def start(self):
+        """ Step on a background thread until stop() """
+        if self._thread:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="simulation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    @property
+    def threaded(self):
+        return self._thread is not None
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stopping.is_set():
+            now = time.perf_counter()
+            self.advance(now - last)
+            last = now
+            self._stopping.wait(max(0, self.timestep - self.accumulator))
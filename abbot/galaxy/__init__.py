@@ -1,3 +1,6 @@
 from abbot.galaxy.celestial_body import CelestialBody
-from abbot.galaxy.chunk import Chunk
+from abbot.galaxy.chunk import Chunk, FarFieldChunk
+from abbot.galaxy.chunk_cache import ChunkCache
+from abbot.galaxy.chunk_store import ChunkStore
 from abbot.galaxy.galaxy import Galaxy
+from abbot.galaxy.prefetch import ChunkPrefetcher
@@ -1,31 +1,22 @@
-import pymunk
+class CelestialBody:
+    """Plain data record of a celestial body, cheap to generate, cache and
+    serialize. Physics shapes are only bound to it while its chunk is in the
+    Driver's space, see physics.ChunkBinding.
+    """
 
+    __slots__ = ("x", "y", "radius")
 
-class CelestialBody:
     def __init__(self, x, y, radius):
         """ x, y in absolute coordinates """
+        self.x = x
+        self.y = y
         self.radius = radius
 
-        mass = 1
-        moment = pymunk.moment_for_circle(mass, 0, radius)
-        self.body = pymunk.Body(mass, moment, body_type=pymunk.body.Body.STATIC)
-        self.body.position = x, y
-        self.shape = pymunk.Circle(self.body, radius)
-        self.shape.friction = 0.5
-
-    @property
-    def x(self):
-        return self.body.position.x
-
-    @property
-    def y(self):
-        return self.body.position.y
-
     def __eq__(self, obj):
         return self.x == obj.x and self.y == obj.y and self.radius == obj.radius
 
     def __hash__(self):
-        return (self.x << 16) + (self.y << 8) + self.radius
+        return hash((self.x, self.y, self.radius))
 
     def __str__(self):
         return f"[CelestialBody {self.x},{self.y} r={self.radius}]"
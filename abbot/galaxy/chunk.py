@@ -1,8 +1,20 @@
-import random
+import itertools
 
-import arcade
+import numpy
 
 from abbot.galaxy.celestial_body import CelestialBody
+from abbot.galaxy.rng import (
+    ChunkRandom,
+    chunk_key,
+    chunk_keys,
+    draw_u64s,
+    randint_array,
+)
+
+CELESTIAL_BODY_OFFSET = 2 ** 9
+CELESTIAL_BODY_MIN_RADIUS = 2 ** 9
+CELESTIAL_BODY_MAX_RADIUS = 2 ** 11
+CELESTIAL_BODIES_PER_CHUNK = 1
 
 
 class Chunk:
@@ -14,19 +26,30 @@ class Chunk:
     coordinates.
     """
 
-    def __init__(self, seed, chunk_x, chunk_y, chunk_width):
+    def __init__(self, seed, chunk_x, chunk_y, chunk_width, celestial_bodies=None):
+        """Generate the chunk, unless its celestial_bodies are given, e.g.
+        when loaded from a chunk store. dirty marks chunks that differ from
+        what is stored, which includes freshly generated chunks.
+        """
         self.seed = seed
         self.chunk_x = chunk_x
         self.chunk_y = chunk_y
         self.chunk_width = chunk_width
         self.center_x = chunk_x * chunk_width
         self.center_y = chunk_y * chunk_width
+        # computed once, since chunks are hashed and compared on hot paths
+        self.chunk_seed = chunk_key(seed, chunk_x, chunk_y)
 
-        self.seed_chunk()
-        self.celestial_bodies = []
-        self.create_celestial_body()
-        # TODO generate more/varied celestial modies
-        # TODO generate features on celestial bodies
+        if celestial_bodies is None:
+            self.seed_chunk()
+            self.celestial_bodies = []
+            self.create_celestial_bodies()
+            # TODO generate features on celestial bodies
+            self.dirty = True
+        else:
+            self.celestial_bodies = list(celestial_bodies)
+            self.dirty = False
+        self.update_celestial_body_arrays()
 
     def __eq__(self, obj):
         return self.chunk_seed == obj.chunk_seed
@@ -38,20 +61,117 @@ class Chunk:
         return f"[Chunk {self.chunk_x},{self.chunk_y} seed={self.chunk_seed}]"
 
     def seed_chunk(self):
-        """Initial pass at seed method. This should be consistent whenever
-        we see this chunk, since it will be reclaimed and die at any time.
-        This must incorporate the global seed and the chunk coordinates, at
-        a minimum.
+        """Create this chunk's own random generator. This is consistent
+        whenever we see this chunk, since it will be reclaimed and die at any
+        time, and is independent of the random module and of other chunks, so
+        chunks may be generated in any order and on any thread.
+        """
+        self.random = ChunkRandom(
+            self.seed, self.chunk_x, self.chunk_y, key=self.chunk_seed
+        )
+
+    def create_celestial_bodies(self):
+        for x, y, radius in random_celestial_bodies(
+            self.random, self.center_x, self.center_y
+        ):
+            self.celestial_bodies.append(CelestialBody(x, y, radius))
+
+    def update_celestial_body_arrays(self):
+        """Mirror celestial bodies into contiguous x, y and radius arrays,
+        index aligned with celestial_bodies, for vectorized queries.
         """
-        random.seed(self.chunk_seed)
-
-    def create_celestial_body(self):
-        x = self.center_x + random.randint(-(2 ** 9), 2 ** 9)
-        y = self.center_y + random.randint(-(2 ** 9), 2 ** 9)
-        radius = random.randint(2 ** 9, 2 ** 11)
-        body = CelestialBody(x, y, radius)
-        self.celestial_bodies.append(body)
-
-    @property
-    def chunk_seed(self):
-        return self.seed + self.chunk_y * self.chunk_width + self.chunk_x
+        self.xs = numpy.array([body.x for body in self.celestial_bodies], dtype=float)
+        self.ys = numpy.array([body.y for body in self.celestial_bodies], dtype=float)
+        self.radii = numpy.array(
+            [body.radius for body in self.celestial_bodies], dtype=float
+        )
+
+
+class FarFieldChunk:
+    """Level of detail stand in for a chunk outside the physics window: only
+    the positions and radii of its celestial bodies, without any physics
+    objects, for cheap drawing and long range navigation queries.
+    """
+
+    def __init__(self, chunk_x, chunk_y, chunk_width, xs, ys, radii):
+        self.chunk_x = chunk_x
+        self.chunk_y = chunk_y
+        self.chunk_width = chunk_width
+        self.center_x = chunk_x * chunk_width
+        self.center_y = chunk_y * chunk_width
+        self.xs = xs
+        self.ys = ys
+        self.radii = radii
+
+    def __str__(self):
+        return f"[FarFieldChunk {self.chunk_x},{self.chunk_y}]"
+
+    @classmethod
+    def generate(cls, seed, chunk_x, chunk_y, chunk_width):
+        """ Generate the same celestial bodies Chunk would, as arrays only """
+        celestial_bodies = random_celestial_bodies(
+            ChunkRandom(seed, chunk_x, chunk_y),
+            chunk_x * chunk_width,
+            chunk_y * chunk_width,
+        )
+        xs, ys, radii = numpy.array(celestial_bodies, dtype=float).reshape(-1, 3).T
+        return cls(chunk_x, chunk_y, chunk_width, xs, ys, radii)
+
+    @classmethod
+    def from_chunk(cls, chunk):
+        return cls(
+            chunk.chunk_x,
+            chunk.chunk_y,
+            chunk.chunk_width,
+            chunk.xs,
+            chunk.ys,
+            chunk.radii,
+        )
+
+
+def random_celestial_bodies(random, center_x, center_y):
+    """Draw a chunk's celestial bodies as x, y, radius tuples from its random
+    generator. Chunk and FarFieldChunk share this so they always agree on
+    how many bodies a chunk has and where.
+    """
+    return draw_celestial_bodies(random.randint, center_x, center_y)
+
+
+def draw_celestial_bodies(randint, center_x, center_y):
+    """Lay out a chunk's celestial bodies as x, y, radius tuples, drawing
+    every value in order with randint(a, b). This is the one place the body
+    count and draw order are defined: randint either draws from one chunk's
+    generator, or elementwise for many chunks at once, with center_x and
+    center_y arrays, see generate_celestial_body_arrays.
+    """
+    # TODO generate more/varied celestial bodies
+    return [
+        (
+            center_x + randint(-CELESTIAL_BODY_OFFSET, CELESTIAL_BODY_OFFSET),
+            center_y + randint(-CELESTIAL_BODY_OFFSET, CELESTIAL_BODY_OFFSET),
+            randint(CELESTIAL_BODY_MIN_RADIUS, CELESTIAL_BODY_MAX_RADIUS),
+        )
+        for _ in range(CELESTIAL_BODIES_PER_CHUNK)
+    ]
+
+
+def generate_celestial_body_arrays(seed, chunk_xs, chunk_ys, chunk_width):
+    """Return xs, ys and radii of the celestial bodies the given chunks
+    generate, each chunk's bodies in turn, vectorized over the chunks with
+    the same draws Chunk makes, without constructing any chunks.
+    """
+    chunk_xs = numpy.asarray(chunk_xs, dtype=numpy.int64)
+    chunk_ys = numpy.asarray(chunk_ys, dtype=numpy.int64)
+    keys = chunk_keys(seed, chunk_xs, chunk_ys)
+    counters = itertools.count(1)
+
+    def randint(a, b):
+        return randint_array(draw_u64s(keys, next(counters)), a, b)
+
+    celestial_bodies = draw_celestial_bodies(
+        randint, chunk_xs * chunk_width, chunk_ys * chunk_width
+    )
+    # from body, value, chunk order to each chunk's bodies in turn
+    values = numpy.array(celestial_bodies, dtype=float).reshape(-1, 3, len(chunk_xs))
+    xs, ys, radii = values.transpose(1, 2, 0).reshape(3, -1)
+    return xs, ys, radii
@@ -0,0 +1,138 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Rough per chunk memory estimate: a celestial body record and its array
+# entries per celestial body, plus fixed chunk overhead.
+CHUNK_OVERHEAD_BYTES = 2048
+CELESTIAL_BODY_BYTES = 256
+
+
+def estimate_chunk_bytes(chunk):
+    return CHUNK_OVERHEAD_BYTES + CELESTIAL_BODY_BYTES * len(chunk.celestial_bodies)
+
+
+@dataclass
+class ChunkCacheStats:
+    """ Counters for sizing the chunk cache against traversal patterns """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    generation_time: float = 0
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0
+
+    @property
+    def mean_generation_time(self):
+        return self.generation_time / self.misses if self.misses else 0
+
+    def __str__(self):
+        return (
+            f"[ChunkCacheStats hits={self.hits} misses={self.misses} "
+            f"evictions={self.evictions} hit_rate={self.hit_rate:.2f} "
+            f"mean_generation_time={self.mean_generation_time * 1000:.3f}ms]"
+        )
+
+
+class ChunkCache:
+    """Cache of chunks keyed on chunk coordinates. Pinned chunks, normally
+    the active chunks, are never evicted. Besides those, up to max_chunks
+    recently used chunks are retained, and if max_bytes is set, their
+    estimated size is bounded as well. Least recently used chunks go first.
+
+    load(chunk_x, chunk_y) is called to produce a chunk on a miss.
+    """
+
+    def __init__(self, load, max_chunks=16, max_bytes=None, chunk_bytes=None):
+        self.load = load
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes or estimate_chunk_bytes
+        self.stats = ChunkCacheStats()
+        self._chunks = OrderedDict()
+        self._pinned = set()
+        self._unpinned_bytes = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def __contains__(self, chunk_coordinates):
+        return chunk_coordinates in self._chunks
+
+    def get(self, chunk_x, chunk_y):
+        chunk_coordinates = (chunk_x, chunk_y)
+        chunk = self._chunks.get(chunk_coordinates)
+        if chunk is not None:
+            self.stats.hits += 1
+            self._chunks.move_to_end(chunk_coordinates)
+            return chunk
+        self.stats.misses += 1
+        start = time.perf_counter()
+        chunk = self.load(chunk_x, chunk_y)
+        self.stats.generation_time += time.perf_counter() - start
+        self._insert(chunk_coordinates, chunk)
+        return chunk
+
+    def peek(self, chunk_x, chunk_y):
+        """Return the cached chunk or None, without loading it on a miss,
+        counting the lookup or making it recently used.
+        """
+        return self._chunks.get((chunk_x, chunk_y))
+
+    def put(self, chunk):
+        """ Insert an already built chunk, e.g. one loaded ahead of time """
+        chunk_coordinates = (chunk.chunk_x, chunk.chunk_y)
+        if chunk_coordinates not in self._chunks:
+            self._insert(chunk_coordinates, chunk)
+
+    def pin(self, chunk_coordinates_iterable):
+        """Replace the set of pinned chunk coordinates. Chunks that are no
+        longer pinned join the recently used ring, and may be evicted.
+        """
+        pinned = set(chunk_coordinates_iterable)
+        for chunk_coordinates in self._pinned - pinned:
+            if chunk_coordinates in self._chunks:
+                self._unpinned_bytes += self.chunk_bytes(
+                    self._chunks[chunk_coordinates]
+                )
+        for chunk_coordinates in pinned - self._pinned:
+            if chunk_coordinates in self._chunks:
+                self._unpinned_bytes -= self.chunk_bytes(
+                    self._chunks[chunk_coordinates]
+                )
+        self._pinned = pinned
+        self.evict()
+
+    def is_pinned(self, chunk_x, chunk_y):
+        return (chunk_x, chunk_y) in self._pinned
+
+    def evict(self):
+        """ Evict least recently used unpinned chunks until within limits """
+        unpinned = [c for c in self._chunks if c not in self._pinned]
+        unpinned_count = len(unpinned)
+        for chunk_coordinates in unpinned:
+            if not self._over_limits(unpinned_count):
+                break
+            chunk = self._chunks.pop(chunk_coordinates)
+            self._unpinned_bytes -= self.chunk_bytes(chunk)
+            self.stats.evictions += 1
+            unpinned_count -= 1
+
+    def clear(self):
+        self._chunks.clear()
+        self._unpinned_bytes = 0
+
+    def _insert(self, chunk_coordinates, chunk):
+        self._chunks[chunk_coordinates] = chunk
+        if chunk_coordinates not in self._pinned:
+            self._unpinned_bytes += self.chunk_bytes(chunk)
+        self.evict()
+
+    def _over_limits(self, unpinned_count):
+        if unpinned_count > self.max_chunks:
+            return True
+        return self.max_bytes is not None and self._unpinned_bytes > self.max_bytes
@@ -0,0 +1,172 @@
+import mmap
+import os
+import struct
+import threading
+
+import numpy
+
+from abbot.galaxy.rng import seed_from_u64, seed_to_u64
+
+# Chunks per region file side, so each file holds REGION_SIZE ** 2 chunks
+REGION_SIZE = 32
+MAGIC = b"ABRG"
+VERSION = 1
+# magic, version, region size, galaxy seed, chunk width
+HEADER = struct.Struct("<4sHHQI")
+# per chunk slot: data offset and length, zero length for absent chunks
+INDEX_ENTRY = struct.Struct("<QI")
+INDEX_DTYPE = numpy.dtype([("offset", "<u8"), ("length", "<u4")])
+INDEX_OFFSET = HEADER.size
+DATA_OFFSET = INDEX_OFFSET + INDEX_ENTRY.size * REGION_SIZE ** 2
+# chunk record: body count, then that many x, then y, then radius float64s
+RECORD_HEADER = struct.Struct("<I")
+
+
+def encode_chunk(chunk):
+    return (
+        RECORD_HEADER.pack(len(chunk.celestial_bodies))
+        + chunk.xs.astype("<f8").tobytes()
+        + chunk.ys.astype("<f8").tobytes()
+        + chunk.radii.astype("<f8").tobytes()
+    )
+
+
+def decode_chunk(buffer, offset=0):
+    """ Return copies of the xs, ys, radii arrays of the record at offset """
+    (count,) = RECORD_HEADER.unpack_from(buffer, offset)
+    arrays = numpy.frombuffer(
+        buffer, "<f8", count * 3, offset + RECORD_HEADER.size
+    ).reshape(3, count)
+    return arrays[0].copy(), arrays[1].copy(), arrays[2].copy()
+
+
+class ChunkStore:
+    """Persistent chunk storage in region files of REGION_SIZE x REGION_SIZE
+    chunks. Each region file is a header, a fixed index of record offsets by
+    chunk coordinates, then chunk records appended in write order. Reads go
+    through a read only memory map of the region file. Rewriting a chunk
+    appends a new record, leaving the old one unreferenced.
+    """
+
+    def __init__(self, directory, seed, chunk_width):
+        self.directory = directory
+        self.seed = seed
+        self.chunk_width = chunk_width
+        self._regions = {}
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def region_coordinates(chunk_x, chunk_y):
+        return chunk_x // REGION_SIZE, chunk_y // REGION_SIZE
+
+    @staticmethod
+    def region_slot(chunk_x, chunk_y):
+        return (chunk_y % REGION_SIZE) * REGION_SIZE + chunk_x % REGION_SIZE
+
+    def region_path(self, region_x, region_y):
+        return os.path.join(self.directory, f"r.{region_x}.{region_y}.abr")
+
+    def contains(self, chunk_x, chunk_y):
+        with self._lock:
+            region = self._region(*self.region_coordinates(chunk_x, chunk_y))
+            if region is None:
+                return False
+            _, index = region
+            return bool(index[self.region_slot(chunk_x, chunk_y)]["length"])
+
+    def read(self, chunk_x, chunk_y):
+        """ Return the stored xs, ys, radii arrays of the chunk, or None """
+        with self._lock:
+            region = self._region(*self.region_coordinates(chunk_x, chunk_y))
+            if region is None:
+                return None
+            region_map, index = region
+            offset, length = index[self.region_slot(chunk_x, chunk_y)]
+            if not length:
+                return None
+            return decode_chunk(region_map, int(offset))
+
+    def write(self, chunks):
+        """ Write chunks, batched into one append per region file """
+        self.write_records(
+            (chunk.chunk_x, chunk.chunk_y, encode_chunk(chunk)) for chunk in chunks
+        )
+
+    def write_records(self, records):
+        """Write (chunk_x, chunk_y, encoded chunk) records, batched into one
+        append per region file.
+        """
+        records_by_region = {}
+        for record in records:
+            region_coordinates = self.region_coordinates(record[0], record[1])
+            records_by_region.setdefault(region_coordinates, []).append(record)
+        with self._lock:
+            for region_coordinates, region_records in records_by_region.items():
+                self._write_region(region_coordinates, region_records)
+
+    def close(self):
+        with self._lock:
+            for region_coordinates in list(self._regions):
+                self._close_region(region_coordinates)
+
+    def _write_region(self, region_coordinates, records):
+        self._close_region(region_coordinates)
+        path = self.region_path(*region_coordinates)
+        if not os.path.exists(path):
+            with open(path, "wb") as region_file:
+                region_file.write(
+                    HEADER.pack(
+                        MAGIC,
+                        VERSION,
+                        REGION_SIZE,
+                        seed_to_u64(self.seed),
+                        self.chunk_width,
+                    )
+                )
+                region_file.write(bytes(DATA_OFFSET - INDEX_OFFSET))
+        with open(path, "r+b") as region_file:
+            self._check_header(path, region_file.read(HEADER.size))
+            offset = region_file.seek(0, os.SEEK_END)
+            region_file.write(b"".join(record for _, _, record in records))
+            # only index records once their data is fully written
+            region_file.flush()
+            for chunk_x, chunk_y, record in records:
+                region_file.seek(
+                    INDEX_OFFSET + INDEX_ENTRY.size * self.region_slot(chunk_x, chunk_y)
+                )
+                region_file.write(INDEX_ENTRY.pack(offset, len(record)))
+                offset += len(record)
+
+    def _region(self, region_x, region_y):
+        """ Return the (memory map, index) of a region, or None if absent """
+        region = self._regions.get((region_x, region_y))
+        if region is not None:
+            return region
+        path = self.region_path(region_x, region_y)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as region_file:
+            region_map = mmap.mmap(region_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._check_header(path, region_map[: HEADER.size])
+        index = numpy.frombuffer(
+            region_map, INDEX_DTYPE, REGION_SIZE ** 2, INDEX_OFFSET
+        ).copy()
+        region = self._regions[(region_x, region_y)] = (region_map, index)
+        return region
+
+    def _close_region(self, region_coordinates):
+        region = self._regions.pop(region_coordinates, None)
+        if region is not None:
+            region[0].close()
+
+    def _check_header(self, path, header):
+        magic, version, region_size, seed, chunk_width = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or region_size != REGION_SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} region file")
+        if seed != seed_to_u64(self.seed) or chunk_width != self.chunk_width:
+            raise ValueError(
+                f"{path} is for seed {seed_from_u64(seed)} and chunk width "
+                f"{chunk_width}, not seed {self.seed} and chunk width "
+                f"{self.chunk_width}"
+            )
@@ -1,8 +1,12 @@
 import random
-from functools import lru_cache
 
-from abbot.galaxy.chunk import Chunk
-from abbot.math import distance
+import numpy
+
+from abbot.galaxy.chunk import Chunk, FarFieldChunk
+from abbot.galaxy.celestial_body import CelestialBody
+from abbot.galaxy.chunk_cache import ChunkCache
+from abbot.galaxy.chunk_store import ChunkStore
+from abbot.galaxy.spatial_index import CelestialBodyIndex
 
 
 class Galaxy:
@@ -19,44 +23,320 @@ class Galaxy:
     within chunks. This allows each chunk to only care about what is within the
     chunk. This could lead to bodies being in close proximity to each other,
     but we will handle that at the physics engine level.
+
+    Active chunks are those within physics_radius chunks of the player, which
+    take part in physics. Chunks beyond those but within far_field_radius are
+    kept as lightweight FarFieldChunks, for drawing and navigation.
     """
 
-    def __init__(self, seed=None, chunk_width=2 ** 14):
+    def __init__(
+        self,
+        seed=None,
+        chunk_width=2 ** 14,
+        cache_chunks=16,
+        cache_bytes=None,
+        store_directory=None,
+        store_batch_size=16,
+        physics_radius=1,
+        far_field_radius=3,
+    ):
         self.seed = seed if seed else random.randint(0, 2 ** 32)
         self.chunk_width = chunk_width
+        self.chunk_cache = ChunkCache(
+            self._chunk_cache_miss, max_chunks=cache_chunks, max_bytes=cache_bytes
+        )
+        self.store = (
+            ChunkStore(store_directory, self.seed, chunk_width)
+            if store_directory
+            else None
+        )
+        self.store_batch_size = store_batch_size
+        self.physics_radius = physics_radius
+        self.far_field_radius = far_field_radius
+        self._dirty_chunks = {}
+        self.modified_chunks = {}
+        self.active_chunks = []
+        self._active_chunk_coordinates = None
+        self._celestial_body_index = CelestialBodyIndex()
+        self._active_celestial_bodies = []
+        self._active_xs = numpy.empty(0)
+        self._active_ys = numpy.empty(0)
+        self._active_radii = numpy.empty(0)
+        self._prefetched_chunks = {}
+        self.far_field_chunks = []
+        self._far_field_chunks_by_coordinates = {}
+        self._far_field_xs = numpy.empty(0)
+        self._far_field_ys = numpy.empty(0)
+        self._far_field_radii = numpy.empty(0)
 
     def position_to_chunk_coordinates(self, x, y):
         """ Return the chunk coordinates based on the absolute x,y coordinates """
         return int(x // self.chunk_width), int(y // self.chunk_width)
 
     def closest_celestial_body(self, x, y):
-        """ Return the chunk coordinates based on the absolute x,y coordinates """
-        closest = None
-        closest_distance = -1
-        for chunk in self.position_to_active_chunks(x, y):
-            for celestial_body in chunk.celestial_bodies:
-                celestial_body_distance = (
-                    distance(celestial_body.x, celestial_body.y, x, y)
-                    - celestial_body.radius
-                )
-                if closest is None or celestial_body_distance < closest_distance:
-                    closest_distance = celestial_body_distance
-                    closest = celestial_body
-        return closest
-
-    @lru_cache(maxsize=9)
+        """Return the active celestial body whose surface is closest to x,y.
+        Queries never move the active chunks, see update_active_chunks.
+        """
+        return self._celestial_body_index.closest(x, y)
+
+    def k_closest_celestial_bodies(self, x, y, k):
+        """Return up to k active celestial bodies ordered by distance from
+        x,y to their surface, closest first.
+        """
+        return self._celestial_body_index.k_closest(x, y, k)
+
+    def update_active_chunks(self, x, y):
+        """Refresh the active chunks and the spatial index over their
+        celestial bodies. Work is only done when x,y has moved into a
+        different chunk than on the previous call.
+        """
+        chunk_coordinates = self.position_to_chunk_coordinates(x, y)
+        if chunk_coordinates == self._active_chunk_coordinates:
+            return self.active_chunks
+        self._active_chunk_coordinates = chunk_coordinates
+        last_active_chunks = self.active_chunks
+        self.chunk_cache.pin(self.position_to_active_chunk_coordinates(x, y))
+        self.active_chunks = list(self.position_to_active_chunks(x, y))
+        for chunk in last_active_chunks:
+            if chunk not in self.active_chunks:
+                self._celestial_body_index.remove_chunk(chunk)
+        for chunk in self.active_chunks:
+            self._celestial_body_index.add_chunk(chunk)
+        self._active_celestial_bodies = [
+            body for chunk in self.active_chunks for body in chunk.celestial_bodies
+        ]
+        self._active_xs = numpy.concatenate([c.xs for c in self.active_chunks])
+        self._active_ys = numpy.concatenate([c.ys for c in self.active_chunks])
+        self._active_radii = numpy.concatenate([c.radii for c in self.active_chunks])
+        self.update_far_field_chunks(x, y)
+        return self.active_chunks
+
+    def update_far_field_chunks(self, x, y):
+        """Refresh the far field chunks around x,y, reusing those still in
+        range and dropping the rest.
+        """
+        active_chunk_coordinates = set(self.position_to_active_chunk_coordinates(x, y))
+        far_field_chunks_by_coordinates = {}
+        for chunk_coordinates in self.position_to_chunk_coordinates_within(
+            x, y, self.far_field_radius
+        ):
+            if chunk_coordinates in active_chunk_coordinates:
+                continue
+            far_field_chunk = self._far_field_chunks_by_coordinates.get(
+                chunk_coordinates
+            )
+            if far_field_chunk is None:
+                far_field_chunk = self.load_far_field_chunk(*chunk_coordinates)
+            far_field_chunks_by_coordinates[chunk_coordinates] = far_field_chunk
+        self._far_field_chunks_by_coordinates = far_field_chunks_by_coordinates
+        self.far_field_chunks = list(far_field_chunks_by_coordinates.values())
+        self._far_field_xs = numpy.concatenate(
+            [c.xs for c in self.far_field_chunks] or [numpy.empty(0)]
+        )
+        self._far_field_ys = numpy.concatenate(
+            [c.ys for c in self.far_field_chunks] or [numpy.empty(0)]
+        )
+        self._far_field_radii = numpy.concatenate(
+            [c.radii for c in self.far_field_chunks] or [numpy.empty(0)]
+        )
+        return self.far_field_chunks
+
+    def load_far_field_chunk(self, chunk_x, chunk_y):
+        """Return the far field representation of a chunk, from the modified
+        or cached chunk or the chunk store if possible, else generating only
+        its arrays. Chunks are never loaded into the cache for this.
+        """
+        chunk = self.modified_chunks.get((chunk_x, chunk_y))
+        if chunk is None:
+            chunk = self.chunk_cache.peek(chunk_x, chunk_y)
+        if chunk is not None:
+            return FarFieldChunk.from_chunk(chunk)
+        if self.store:
+            stored = self.store.read(chunk_x, chunk_y)
+            if stored is not None:
+                return FarFieldChunk(chunk_x, chunk_y, self.chunk_width, *stored)
+        return FarFieldChunk.generate(self.seed, chunk_x, chunk_y, self.chunk_width)
+
+    def celestial_body_arrays(self):
+        """Return xs, ys and radii of every active and far field celestial
+        body, e.g. as the sources of a GravityField.
+        """
+        return (
+            numpy.concatenate([self._active_xs, self._far_field_xs]),
+            numpy.concatenate([self._active_ys, self._far_field_ys]),
+            numpy.concatenate([self._active_radii, self._far_field_radii]),
+        )
+
+    def closest_far_field_celestial_body(self, x, y):
+        """Return x, y, radius of the far field celestial body whose surface
+        is closest to x,y, e.g. to navigate beyond the active chunks, or None
+        if there are none.
+        """
+        if not len(self._far_field_radii):
+            return None
+        i = numpy.argmin(
+            numpy.hypot(self._far_field_xs - x, self._far_field_ys - y)
+            - self._far_field_radii
+        )
+        return (
+            float(self._far_field_xs[i]),
+            float(self._far_field_ys[i]),
+            float(self._far_field_radii[i]),
+        )
+
+    def closest_celestial_bodies(self, xs, ys):
+        """Batched nearest surface query over the active celestial bodies.
+        Return, for each point in xs,ys, the body whose surface is closest, or
+        None for every point if there are no active bodies.
+        """
+        closest, _, _, _ = self._celestial_body_index.closest_many(xs, ys)
+        return closest.tolist()
+
+    def closest_celestial_body_positions(self, xs, ys):
+        """Batched nearest surface query returning arrays of the closest
+        active celestial body x and y for each point, and a mask of the
+        points for which there was any active body at all.
+        """
+        _, closest_xs, closest_ys, found = self._celestial_body_index.closest_many(
+            xs, ys
+        )
+        return closest_xs, closest_ys, found
+
+    def celestial_bodies_within(self, x, y, radius):
+        """ Return active celestial bodies whose surface is within radius of x,y """
+        surface_distances = (
+            numpy.hypot(self._active_xs - x, self._active_ys - y) - self._active_radii
+        )
+        return self._active_celestial_bodies_where(surface_distances <= radius)
+
+    def celestial_bodies_in_rect(self, left, bottom, right, top):
+        """ Return active celestial bodies intersecting the given rectangle """
+        nearest_xs = numpy.clip(self._active_xs, left, right)
+        nearest_ys = numpy.clip(self._active_ys, bottom, top)
+        squared_distances = (nearest_xs - self._active_xs) ** 2 + (
+            nearest_ys - self._active_ys
+        ) ** 2
+        return self._active_celestial_bodies_where(
+            squared_distances <= self._active_radii ** 2
+        )
+
+    def _active_celestial_bodies_where(self, mask):
+        return [self._active_celestial_bodies[i] for i in numpy.flatnonzero(mask)]
+
     def chunk_from_chunk_coordinates(self, chunk_x, chunk_y):
+        return self.chunk_cache.get(chunk_x, chunk_y)
+
+    def has_chunk(self, chunk_x, chunk_y):
+        """ Return whether the chunk is cached or modified, so needs no generation """
+        chunk_coordinates = (chunk_x, chunk_y)
+        return (
+            chunk_coordinates in self.chunk_cache
+            or chunk_coordinates in self.modified_chunks
+        )
+
+    def _chunk_cache_miss(self, chunk_x, chunk_y):
+        prefetched = self._prefetched_chunks.pop((chunk_x, chunk_y), None)
+        if (chunk_x, chunk_y) in self.modified_chunks:
+            chunk = self.modified_chunks[(chunk_x, chunk_y)]
+        elif prefetched is not None and not prefetched.cancelled():
+            chunk = prefetched.result()
+        else:
+            chunk = self.load_chunk(chunk_x, chunk_y)
+        if chunk.dirty:
+            self.mark_dirty(chunk)
+        return chunk
+
+    def load_chunk(self, chunk_x, chunk_y):
+        """Read a chunk from the chunk store, falling back to generating it.
+        Safe to call from any thread, concurrently.
+        """
+        if self.store:
+            stored = self.store.read(chunk_x, chunk_y)
+            if stored is not None:
+                return self.chunk_from_arrays(chunk_x, chunk_y, *stored)
+        return self.generate_chunk(chunk_x, chunk_y)
+
+    def chunk_from_arrays(self, chunk_x, chunk_y, xs, ys, radii):
+        """ Build a chunk from celestial body arrays, e.g. as stored """
+        return Chunk(
+            self.seed,
+            chunk_x,
+            chunk_y,
+            self.chunk_width,
+            celestial_bodies=[
+                CelestialBody(x, y, radius)
+                for x, y, radius in zip(xs.tolist(), ys.tolist(), radii.tolist())
+            ],
+        )
+
+    def generate_chunk(self, chunk_x, chunk_y):
+        """ Build a chunk. Safe to call from any thread, concurrently """
         return Chunk(self.seed, chunk_x, chunk_y, self.chunk_width)
 
+    def mark_dirty(self, chunk):
+        """Queue a chunk to be written to the chunk store, which happens in
+        batches of store_batch_size.
+        """
+        if not self.store:
+            return
+        chunk.dirty = True
+        self._dirty_chunks[(chunk.chunk_x, chunk.chunk_y)] = chunk
+        if len(self._dirty_chunks) >= self.store_batch_size:
+            self.flush()
+
+    def mark_modified(self, chunk):
+        """Record that a chunk differs from what generation gives, e.g. after
+        gameplay changed it. Modified chunks are kept in memory even when
+        evicted from the cache, are included in Driver snapshots, and are
+        written to the chunk store if there is one.
+        """
+        self.modified_chunks[(chunk.chunk_x, chunk.chunk_y)] = chunk
+        self.mark_dirty(chunk)
+
+    def flush(self):
+        """ Write every dirty chunk to the chunk store """
+        if not self.store or not self._dirty_chunks:
+            return
+        chunks = list(self._dirty_chunks.values())
+        self._dirty_chunks.clear()
+        self.store.write(chunks)
+        for chunk in chunks:
+            chunk.dirty = False
+
+    def close(self):
+        self.flush()
+        if self.store:
+            self.store.close()
+
+    def add_prefetched_chunk(self, chunk_x, chunk_y, future):
+        """Register a future resolving to the chunk at these coordinates, to
+        be used instead of generating it when it is first requested.
+        """
+        self._prefetched_chunks[(chunk_x, chunk_y)] = future
+
+    def discard_prefetched_chunk(self, chunk_x, chunk_y):
+        self._prefetched_chunks.pop((chunk_x, chunk_y), None)
+
+    def cache_prefetched_chunk(self, chunk):
+        """ Move a finished prefetched chunk into the chunk cache """
+        self.discard_prefetched_chunk(chunk.chunk_x, chunk.chunk_y)
+        if chunk.dirty:
+            self.mark_dirty(chunk)
+        self.chunk_cache.put(chunk)
+
     def chunk_center_from_chunk_coordinates(self, chunk_x, chunk_y):
         return self.chunk_width * chunk_x, self.chunk_width * chunk_y
 
     def position_to_active_chunk_coordinates(self, x, y):
+        return self.position_to_chunk_coordinates_within(x, y, self.physics_radius)
+
+    def position_to_chunk_coordinates_within(self, x, y, radius):
+        """ Yield coordinates of chunks within radius chunks of x,y's chunk """
         chunk_coordinate_x, chunk_coordinate_y = self.position_to_chunk_coordinates(
             x, y
         )
-        for chunk_offset_x in [-1, 0, 1]:
-            for chunk_offset_y in [-1, 0, 1]:
+        for chunk_offset_x in range(-radius, radius + 1):
+            for chunk_offset_y in range(-radius, radius + 1):
                 yield chunk_coordinate_x + chunk_offset_x, chunk_coordinate_y + chunk_offset_y
 
     def position_to_active_chunks(self, x, y):
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ChunkPrefetcher:
+    """Predict the chunks the player is heading into from its velocity and
+    build them on a worker thread pool ahead of time, so crossing a chunk
+    boundary does not generate chunks on the frame thread.
+
+    look_ahead_ring is the number of chunks kept prefetched beyond the
+    galaxy's physics window around the predicted position, and
+    look_ahead_seconds how far ahead the position is predicted. Scheduled
+    chunks within the physics window around the predicted position are
+    about to become active, and finished_chunks hands out up to
+    integration_budget of those per frame, moving them into the galaxy's
+    chunk cache. The rest of the ring waits until it is about to become
+    active too, or is dropped once it is no longer predicted.
+
+    schedule is expected once per tick. A chunk is only handed out once it
+    was scheduled at least integration_delay ticks earlier, by which time
+    its worker has normally finished, and is waited on if not. So which
+    chunks are handed out, and when, depends only on the positions and
+    velocities scheduled, never on how far the workers have got, and
+    recorded runs replay exactly with prefetching enabled. Chunks becoming
+    active sooner are left to the galaxy, which takes over their futures.
+    """
+
+    def __init__(
+        self,
+        galaxy,
+        look_ahead_ring=1,
+        look_ahead_seconds=1,
+        integration_budget=1,
+        integration_delay=10,
+        max_workers=2,
+    ):
+        self.galaxy = galaxy
+        self.look_ahead_ring = look_ahead_ring
+        self.look_ahead_seconds = look_ahead_seconds
+        self.integration_budget = integration_budget
+        self.integration_delay = integration_delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="chunk-prefetch"
+        )
+        self.ticks = 0
+        # chunk coordinates to (future, tick scheduled), in scheduling order
+        self._scheduled = {}
+        self._wanted = set()
+        self._becoming_active = set()
+
+    def predicted_position(self, x, y, velocity_x, velocity_y):
+        return (
+            x + velocity_x * self.look_ahead_seconds,
+            y + velocity_y * self.look_ahead_seconds,
+        )
+
+    def predicted_chunk_coordinates(self, x, y, velocity_x, velocity_y):
+        """ Return the chunk coordinates we expect to need soon """
+        return set(
+            self.galaxy.position_to_chunk_coordinates_within(
+                *self.predicted_position(x, y, velocity_x, velocity_y),
+                self.galaxy.physics_radius + self.look_ahead_ring,
+            )
+        )
+
+    def schedule(self, x, y, velocity_x, velocity_y):
+        """Submit generation of predicted chunks that are neither active nor
+        already scheduled, and drop chunks that are no longer predicted or
+        have become active, which the galaxy takes over.
+        """
+        self.ticks += 1
+        self._wanted = self.predicted_chunk_coordinates(x, y, velocity_x, velocity_y)
+        self._becoming_active = set(
+            self.galaxy.position_to_active_chunk_coordinates(
+                *self.predicted_position(x, y, velocity_x, velocity_y)
+            )
+        )
+        active_chunk_coordinates = set(
+            self.galaxy.position_to_active_chunk_coordinates(x, y)
+        )
+        for chunk_coordinates in list(self._scheduled):
+            if chunk_coordinates in active_chunk_coordinates:
+                del self._scheduled[chunk_coordinates]
+            elif chunk_coordinates not in self._wanted:
+                future, _ = self._scheduled.pop(chunk_coordinates)
+                future.cancel()
+                self.galaxy.discard_prefetched_chunk(*chunk_coordinates)
+        for chunk_coordinates in self._wanted - active_chunk_coordinates:
+            if chunk_coordinates in self._scheduled:
+                continue
+            if self.galaxy.has_chunk(*chunk_coordinates):
+                continue
+            future = self._executor.submit(self.galaxy.load_chunk, *chunk_coordinates)
+            self._scheduled[chunk_coordinates] = future, self.ticks
+            self.galaxy.add_prefetched_chunk(*chunk_coordinates, future)
+
+    def finished_chunks(self):
+        """Return up to integration_budget scheduled chunks that are about to
+        become active and were scheduled at least integration_delay ticks
+        ago, now cached by the galaxy, in the order they were scheduled.
+        """
+        finished = []
+        for chunk_coordinates, (future, tick) in list(self._scheduled.items()):
+            if len(finished) >= self.integration_budget:
+                break
+            if self.ticks - tick < self.integration_delay:
+                # scheduled in order, so the rest are more recent still
+                break
+            if chunk_coordinates not in self._becoming_active:
+                continue
+            del self._scheduled[chunk_coordinates]
+            if future.cancelled():
+                continue
+            chunk = future.result()
+            self.galaxy.cache_prefetched_chunk(chunk)
+            finished.append(chunk)
+        return finished
+
+    def wants(self, chunk_x, chunk_y):
+        """ Return whether the chunk is within the predicted look ahead """
+        return (chunk_x, chunk_y) in self._wanted
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
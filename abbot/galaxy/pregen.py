@@ -0,0 +1,135 @@
+"""Pregenerate a rectangle of the galaxy into a chunk store, fanning chunk
+generation out across a process pool, e.g.
+
+    python -m abbot.galaxy.pregen --seed 42 --region=-64,-64,63,63 --output world
+
+Regions are inclusive chunk coordinates. Chunks already in the store are
+skipped, so an interrupted run resumes where it left off.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+
+from abbot.galaxy.chunk import Chunk
+from abbot.galaxy.chunk_store import ChunkStore, encode_chunk
+
+DEFAULT_CHUNK_WIDTH = 2 ** 14
+DEFAULT_BATCH_SIZE = 256
+# Seconds between progress reports
+REPORT_INTERVAL = 5
+
+
+def generate_records(seed, chunk_width, chunk_coordinates):
+    """ Worker: generate and encode a batch of chunks """
+    return [
+        (chunk_x, chunk_y, encode_chunk(Chunk(seed, chunk_x, chunk_y, chunk_width)))
+        for chunk_x, chunk_y in chunk_coordinates
+    ]
+
+
+def write_finished(store, futures):
+    """ Write the records of finished batches, returning the chunk count """
+    written = 0
+    for future in futures:
+        records = future.result()
+        store.write_records(records)
+        written += len(records)
+    return written
+
+
+def parse_region(region):
+    x0, y0, x1, y1 = (int(value) for value in region.split(","))
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def pending_chunk_coordinates(store, region):
+    x0, y0, x1, y1 = region
+    return [
+        (chunk_x, chunk_y)
+        for chunk_y in range(y0, y1 + 1)
+        for chunk_x in range(x0, x1 + 1)
+        if not store.contains(chunk_x, chunk_y)
+    ]
+
+
+def pregenerate(
+    seed,
+    region,
+    directory,
+    chunk_width=DEFAULT_CHUNK_WIDTH,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    report=None,
+):
+    """Generate every chunk in region missing from the store at directory,
+    writing batches as they complete, in whatever order. At most two batches
+    per worker are in flight at once, so finished records do not pile up in
+    memory ahead of the writer. Return the number of chunks generated.
+    report(generated, total, elapsed) is called periodically if given.
+    """
+    store = ChunkStore(directory, seed, chunk_width)
+    try:
+        pending = pending_chunk_coordinates(store, region)
+        batches = (
+            pending[start : start + batch_size]
+            for start in range(0, len(pending), batch_size)
+        )
+        max_in_flight = 2 * (workers or os.cpu_count() or 1)
+        generated = 0
+        start = last_report = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            for batch in batches:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    generated += write_finished(store, done)
+                in_flight.add(
+                    executor.submit(generate_records, seed, chunk_width, batch)
+                )
+                now = time.perf_counter()
+                if report and now - last_report >= REPORT_INTERVAL:
+                    report(generated, len(pending), now - start)
+                    last_report = now
+            generated += write_finished(store, as_completed(in_flight))
+        if report:
+            report(generated, len(pending), time.perf_counter() - start)
+        return generated
+    finally:
+        store.close()
+
+
+def print_report(generated, total, elapsed):
+    rate = generated / elapsed if elapsed else 0
+    print(f"{generated}/{total} chunks in {elapsed:.1f}s, {rate:.1f} chunks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pregenerate galaxy chunks")
+    parser.add_argument("--seed", type=int, required=True)
+    parser.add_argument(
+        "--region", type=parse_region, required=True, help="x0,y0,x1,y1 inclusive"
+    )
+    parser.add_argument("--output", required=True, help="chunk store directory")
+    parser.add_argument("--chunk-width", type=int, default=DEFAULT_CHUNK_WIDTH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    pregenerate(
+        args.seed,
+        args.region,
+        args.output,
+        chunk_width=args.chunk_width,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        report=print_report,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Deterministic, self contained random numbers for chunk generation. Each
+generator is keyed on (galaxy seed, chunk_x, chunk_y, stream) and its n-th
+draw is a pure function of the key and n, so chunks generate identically
+in any order, on any thread or process, and nothing else that uses the
+random module can disturb them. Streams separate independent uses within a
+chunk, e.g. celestial bodies and their features.
+
+Draws are splitmix64 over a counter, which only needs 64 bit wrapping
+arithmetic and so can also be evaluated over NumPy uint64 arrays, see
+chunk_keys and draw_u64s.
+"""
+import numpy
+
+MASK_64 = 2 ** 64 - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+CELESTIAL_BODY_STREAM = 0
+
+
+def seed_to_u64(seed):
+    """Return a galaxy seed as the unsigned 64 bit value files store. Chunk
+    generation only uses the seed modulo 2 ** 64, so this loses nothing.
+    """
+    return seed & MASK_64
+
+
+def seed_from_u64(value):
+    """ Return the seed, signed if need be, a stored unsigned value stands for """
+    return value - 2 ** 64 if value >= 2 ** 63 else value
+
+
+def mix64(value):
+    """ splitmix64 finalizer, a bijective scramble of a 64 bit integer """
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+def chunk_key(seed, chunk_x, chunk_y, stream=CELESTIAL_BODY_STREAM):
+    """ Return the 64 bit generator key for a chunk and stream """
+    key = 0
+    for value in (seed, chunk_x, chunk_y, stream):
+        key = mix64(((key ^ (value & MASK_64)) + GOLDEN_GAMMA) & MASK_64)
+    return key
+
+
+def mix64_array(values):
+    """ mix64 over a NumPy uint64 array, whose arithmetic wraps like MASK_64 """
+    values = (values ^ (values >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+    return values ^ (values >> numpy.uint64(31))
+
+
+def chunk_keys(seed, chunk_xs, chunk_ys, stream=CELESTIAL_BODY_STREAM):
+    """ Return chunk_key for each of chunk_xs, chunk_ys, as a uint64 array """
+    chunk_xs = numpy.asarray(chunk_xs, dtype=numpy.int64).view(numpy.uint64)
+    chunk_ys = numpy.asarray(chunk_ys, dtype=numpy.int64).view(numpy.uint64)
+    keys = numpy.zeros(len(chunk_xs), numpy.uint64)
+    for values in (
+        numpy.uint64(seed & MASK_64),
+        chunk_xs,
+        chunk_ys,
+        numpy.uint64(stream & MASK_64),
+    ):
+        keys = mix64_array((keys ^ values) + numpy.uint64(GOLDEN_GAMMA))
+    return keys
+
+
+def draw_u64s(keys, counter):
+    """Return the counter-th draw, from 1, of ChunkRandom.next_u64 for each
+    key, as a uint64 array.
+    """
+    return mix64_array(keys + numpy.uint64((counter * GOLDEN_GAMMA) & MASK_64))
+
+
+def randint_array(values, a, b):
+    """ Map uint64 draws to integers in [a, b] as ChunkRandom.randint does """
+    return a + (values % numpy.uint64(b - a + 1)).astype(numpy.int64)
+
+
+class ChunkRandom:
+    """Counter based random generator for one chunk and stream. key may be
+    given if already computed with chunk_key for the same arguments.
+    """
+
+    def __init__(self, seed, chunk_x, chunk_y, stream=CELESTIAL_BODY_STREAM, key=None):
+        self.key = key if key is not None else chunk_key(seed, chunk_x, chunk_y, stream)
+        self.counter = 0
+
+    def next_u64(self):
+        self.counter += 1
+        return mix64((self.key + self.counter * GOLDEN_GAMMA) & MASK_64)
+
+    def random(self):
+        """ Return a float in [0, 1) """
+        return (self.next_u64() >> 11) * 2.0 ** -53
+
+    def randint(self, a, b):
+        """ Return an integer in [a, b], both inclusive """
+        return a + self.next_u64() % (b - a + 1)
@@ -0,0 +1,214 @@
+import heapq
+from collections import defaultdict
+
+import numpy
+
+from abbot.math import distance
+
+
+class CelestialBodyIndex:
+    """Uniform grid over celestial bodies, bucketed by body center. Queries
+    walk outward from the query cell ring by ring, and stop as soon as no
+    unvisited cell can hold a closer surface than the best found so far.
+
+    Bodies are added and removed a chunk at a time, which is the granularity
+    at which the galaxy activates and deactivates them.
+    """
+
+    def __init__(self, cell_size=2 ** 12):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        self._chunk_bodies = {}
+        self._max_radius = 0
+        self._bounds = None
+
+    def __len__(self):
+        return sum(len(bodies) for bodies in self._chunk_bodies.values())
+
+    def __contains__(self, chunk):
+        return chunk in self._chunk_bodies
+
+    def cell_coordinates(self, x, y):
+        """ Return the cell coordinates based on the absolute x,y coordinates """
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add_chunk(self, chunk):
+        if chunk in self._chunk_bodies:
+            return
+        self._chunk_bodies[chunk] = list(chunk.celestial_bodies)
+        for celestial_body in chunk.celestial_bodies:
+            cell = self.cell_coordinates(celestial_body.x, celestial_body.y)
+            self._cells[cell].append(celestial_body)
+            self._max_radius = max(self._max_radius, celestial_body.radius)
+            self._extend_bounds(cell)
+
+    def remove_chunk(self, chunk):
+        celestial_bodies = self._chunk_bodies.pop(chunk, None)
+        if celestial_bodies is None:
+            return
+        for celestial_body in celestial_bodies:
+            cell = self.cell_coordinates(celestial_body.x, celestial_body.y)
+            bodies = self._cells[cell]
+            for i, other in enumerate(bodies):
+                if other is celestial_body:
+                    del bodies[i]
+                    break
+            if not bodies:
+                del self._cells[cell]
+        self._recompute_bounds()
+
+    def clear(self):
+        self._cells.clear()
+        self._chunk_bodies.clear()
+        self._max_radius = 0
+        self._bounds = None
+
+    def closest(self, x, y):
+        """ Return the celestial body whose surface is closest to x,y """
+        closest = self.k_closest(x, y, 1)
+        return closest[0] if closest else None
+
+    def k_closest(self, x, y, k):
+        """Return up to k celestial bodies ordered by distance from x,y to
+        their surface, closest first.
+        """
+        if k <= 0 or self._bounds is None:
+            return []
+        cell_x, cell_y = self.cell_coordinates(x, y)
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(
+            cell_x - min_x, max_x - cell_x, cell_y - min_y, max_y - cell_y, 0
+        )
+        # max-heap of the k best seen so far, as (-surface distance, tiebreak, body)
+        best = []
+        tiebreak = 0
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cell_x, cell_y, ring):
+                for celestial_body in self._cells.get(cell, ()):
+                    surface_distance = (
+                        distance(celestial_body.x, celestial_body.y, x, y)
+                        - celestial_body.radius
+                    )
+                    tiebreak += 1
+                    entry = (-surface_distance, tiebreak, celestial_body)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif surface_distance < -best[0][0]:
+                        heapq.heapreplace(best, entry)
+            # anything beyond this ring is at least ring * cell_size away
+            lower_bound = ring * self.cell_size - self._max_radius
+            if len(best) == k and -best[0][0] <= lower_bound:
+                break
+        return [entry[2] for entry in sorted(best, reverse=True)]
+
+    def closest_many(self, xs, ys):
+        """Batched closest, for every point of xs,ys. Points are grouped by
+        cell, and each cell walks rings outward once for all of its points,
+        until no unvisited cell can hold a closer surface for any of them.
+        Return the closest celestial bodies as an object array, their xs and
+        ys, and a mask of the points for which any body was found.
+        """
+        xs = numpy.asarray(xs, dtype=float)
+        ys = numpy.asarray(ys, dtype=float)
+        closest = numpy.full(len(xs), None, dtype=object)
+        closest_xs = numpy.zeros(len(xs))
+        closest_ys = numpy.zeros(len(xs))
+        found = numpy.zeros(len(xs), bool)
+        if not len(xs) or self._bounds is None:
+            return closest, closest_xs, closest_ys, found
+        cells, inverse = numpy.unique(
+            numpy.stack(
+                [
+                    numpy.floor_divide(xs, self.cell_size).astype(numpy.int64),
+                    numpy.floor_divide(ys, self.cell_size).astype(numpy.int64),
+                ],
+                axis=1,
+            ),
+            axis=0,
+            return_inverse=True,
+        )
+        order = numpy.argsort(inverse.ravel(), kind="stable")
+        ends = numpy.cumsum(numpy.bincount(inverse.ravel(), minlength=len(cells)))
+        start = 0
+        for (cell_x, cell_y), end in zip(cells.tolist(), ends.tolist()):
+            points = order[start:end]
+            start = end
+            candidates, body_xs, body_ys, surface_distances = self._cell_candidates(
+                cell_x, cell_y, xs[points], ys[points]
+            )
+            nearest = numpy.argmin(surface_distances, axis=1)
+            candidate_bodies = numpy.empty(len(candidates), dtype=object)
+            candidate_bodies[:] = candidates
+            closest[points] = candidate_bodies[nearest]
+            closest_xs[points] = body_xs[nearest]
+            closest_ys[points] = body_ys[nearest]
+            found[points] = True
+        return closest, closest_xs, closest_ys, found
+
+    def _cell_candidates(self, cell_x, cell_y, xs, ys):
+        """Return the bodies that may be closest to any of xs,ys, which lie
+        in the given cell, their xs and ys, and the surface distance matrix
+        from each point to each of them.
+        """
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(
+            cell_x - min_x, max_x - cell_x, cell_y - min_y, max_y - cell_y, 0
+        )
+        candidates = []
+        body_xs = body_ys = surface_distances = None
+        for ring in range(max_ring + 1):
+            ring_bodies = [
+                celestial_body
+                for cell in self._ring_cells(cell_x, cell_y, ring)
+                for celestial_body in self._cells.get(cell, ())
+            ]
+            if ring_bodies:
+                candidates.extend(ring_bodies)
+                body_xs = numpy.fromiter((b.x for b in candidates), float)
+                body_ys = numpy.fromiter((b.y for b in candidates), float)
+                radii = numpy.fromiter((b.radius for b in candidates), float)
+                surface_distances = (
+                    numpy.hypot(
+                        xs[:, numpy.newaxis] - body_xs, ys[:, numpy.newaxis] - body_ys
+                    )
+                    - radii
+                )
+            # anything beyond this ring is at least ring * cell_size away
+            lower_bound = ring * self.cell_size - self._max_radius
+            if (
+                surface_distances is not None
+                and surface_distances.min(axis=1).max() <= lower_bound
+            ):
+                break
+        return candidates, body_xs, body_ys, surface_distances
+
+    def _ring_cells(self, cell_x, cell_y, ring):
+        if ring == 0:
+            yield cell_x, cell_y
+            return
+        for offset in range(-ring, ring + 1):
+            yield cell_x + offset, cell_y - ring
+            yield cell_x + offset, cell_y + ring
+        for offset in range(-ring + 1, ring):
+            yield cell_x - ring, cell_y + offset
+            yield cell_x + ring, cell_y + offset
+
+    def _extend_bounds(self, cell):
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+            return
+        min_x, min_y, max_x, max_y = self._bounds
+        self._bounds = (
+            min(min_x, cell[0]),
+            min(min_y, cell[1]),
+            max(max_x, cell[0]),
+            max(max_y, cell[1]),
+        )
+
+    def _recompute_bounds(self):
+        self._bounds = None
+        self._max_radius = 0
+        for cell, celestial_bodies in self._cells.items():
+            self._extend_bounds(cell)
+            for celestial_body in celestial_bodies:
+                self._max_radius = max(self._max_radius, celestial_body.radius)
@@ -0,0 +1,172 @@
+import numpy
+
+# Celestial body mass is density times radius squared, and with these
+# constants every body pulls with SURFACE_GRAVITY at its surface, which
+# matches the old constant gravity impulse of 20 per tick at 60 ticks/s.
+SURFACE_GRAVITY = 1200
+CELESTIAL_BODY_DENSITY = 1
+GRAVITATIONAL_CONSTANT = SURFACE_GRAVITY / CELESTIAL_BODY_DENSITY
+# Depth below which bodies share a leaf, so coincident bodies do not split forever
+MAX_DEPTH = 32
+
+
+def celestial_body_masses(radii):
+    return CELESTIAL_BODY_DENSITY * numpy.asarray(radii, dtype=float) ** 2
+
+
+class GravityField:
+    """Barnes-Hut approximation of the summed gravity of many celestial
+    bodies. Bodies are built into a quadtree whose nodes aggregate their mass
+    at their center of mass, and a node is treated as one point mass by any
+    point that sees it under an angle smaller than theta, so each point
+    visits O(log M) nodes rather than all M bodies. A theta of 0 is exact.
+
+    The tree is stored as flat arrays, and accelerations for a batch of
+    points are evaluated node by node, vectorized over the points that reach
+    each node. Within a body's radius gravity falls off linearly to zero at
+    its center, as inside a uniform body, rather than growing without bound.
+    """
+
+    def __init__(self, theta=0.5, gravitational_constant=GRAVITATIONAL_CONSTANT):
+        self.theta = theta
+        self.gravitational_constant = gravitational_constant
+        self.rebuild(numpy.empty(0), numpy.empty(0), numpy.empty(0))
+
+    def __len__(self):
+        return self._body_count
+
+    def rebuild(self, xs, ys, radii, masses=None):
+        """ Build the tree over bodies at xs,ys, with masses from radii by default """
+        xs = numpy.asarray(xs, dtype=float)
+        ys = numpy.asarray(ys, dtype=float)
+        radii = numpy.asarray(radii, dtype=float)
+        masses = (
+            celestial_body_masses(radii)
+            if masses is None
+            else numpy.asarray(masses, dtype=float)
+        )
+        self._body_count = len(xs)
+        nodes = []
+        if self._body_count:
+            min_x, max_x = xs.min(), xs.max()
+            min_y, max_y = ys.min(), ys.max()
+            half_width = max(max_x - min_x, max_y - min_y, 1) / 2
+            self._build(
+                nodes,
+                xs,
+                ys,
+                radii,
+                masses,
+                numpy.arange(self._body_count),
+                (min_x + max_x) / 2,
+                (min_y + max_y) / 2,
+                half_width,
+                0,
+            )
+        node_xs, node_ys, node_masses, node_widths, node_radii, children = (
+            zip(*nodes) if nodes else ((),) * 6
+        )
+        self._node_xs = numpy.array(node_xs, dtype=float)
+        self._node_ys = numpy.array(node_ys, dtype=float)
+        self._node_masses = numpy.array(node_masses, dtype=float)
+        self._node_widths = numpy.array(node_widths, dtype=float)
+        self._node_radii = numpy.array(node_radii, dtype=float)
+        self._children = children
+
+    def _build(
+        self,
+        nodes,
+        xs,
+        ys,
+        radii,
+        masses,
+        indices,
+        center_x,
+        center_y,
+        half_width,
+        depth,
+    ):
+        node = len(nodes)
+        node_masses = masses[indices]
+        mass = node_masses.sum()
+        if mass > 0:
+            x = (xs[indices] * node_masses).sum() / mass
+            y = (ys[indices] * node_masses).sum() / mass
+        else:
+            x, y = xs[indices].mean(), ys[indices].mean()
+        if len(indices) == 1 or depth == MAX_DEPTH:
+            nodes.append((x, y, mass, 2 * half_width, radii[indices].max(), ()))
+            return node
+        nodes.append(None)
+        quadrants = (xs[indices] >= center_x) + 2 * (ys[indices] >= center_y)
+        quarter_width = half_width / 2
+        children = []
+        for quadrant in range(4):
+            quadrant_indices = indices[quadrants == quadrant]
+            if not len(quadrant_indices):
+                continue
+            children.append(
+                self._build(
+                    nodes,
+                    xs,
+                    ys,
+                    radii,
+                    masses,
+                    quadrant_indices,
+                    center_x + (quarter_width if quadrant & 1 else -quarter_width),
+                    center_y + (quarter_width if quadrant & 2 else -quarter_width),
+                    quarter_width,
+                    depth + 1,
+                )
+            )
+        nodes[node] = (x, y, mass, 2 * half_width, 0.0, tuple(children))
+        return node
+
+    def accelerations(self, xs, ys):
+        """ Return arrays of the gravitational acceleration at each of xs,ys """
+        xs = numpy.asarray(xs, dtype=float)
+        ys = numpy.asarray(ys, dtype=float)
+        acceleration_xs = numpy.zeros(len(xs))
+        acceleration_ys = numpy.zeros(len(ys))
+        if not self._body_count or not len(xs):
+            return acceleration_xs, acceleration_ys
+        theta_squared = self.theta ** 2
+        stack = [(0, numpy.arange(len(xs)))]
+        while stack:
+            node, points = stack.pop()
+            dxs = self._node_xs[node] - xs[points]
+            dys = self._node_ys[node] - ys[points]
+            squared_distances = dxs * dxs + dys * dys
+            children = self._children[node]
+            if children:
+                accepted = (
+                    self._node_widths[node] ** 2 < theta_squared * squared_distances
+                )
+                rejected_points = points[~accepted]
+                if len(rejected_points):
+                    for child in children:
+                        stack.append((child, rejected_points))
+                points = points[accepted]
+                dxs = dxs[accepted]
+                dys = dys[accepted]
+                squared_distances = squared_distances[accepted]
+                if not len(points):
+                    continue
+            squared_distances = numpy.maximum(
+                squared_distances, self._node_radii[node] ** 2
+            )
+            # guard coincident points, which feel no pull from a point mass
+            squared_distances[squared_distances == 0] = numpy.inf
+            strengths = (
+                self.gravitational_constant
+                * self._node_masses[node]
+                / (squared_distances * numpy.sqrt(squared_distances))
+            )
+            acceleration_xs[points] += strengths * dxs
+            acceleration_ys[points] += strengths * dys
+        return acceleration_xs, acceleration_ys
+
+    def acceleration(self, x, y):
+        """ Return the gravitational acceleration at x,y """
+        acceleration_xs, acceleration_ys = self.accelerations([x], [y])
+        return float(acceleration_xs[0]), float(acceleration_ys[0])
@@ -1,14 +1,15 @@
+import itertools
 import math
 import random
 import time
-from dataclasses import dataclass
 
 import arcade
+import numpy
 import pymunk
 
-from abbot import settings
+from abbot import physics, settings
 from abbot.ui.animated_sprite import AnimatedSprite
-from abbot.math import distance
+from abbot.proximity import ProximityIndex
 
 ATTACK_DISTANCE = 100
 PLAYER_JUMP_IMPULSE = 1000
@@ -33,19 +34,22 @@ class NPC:
         self.shape.elasticity = 0
         self.shape.friction = 0.5
         self.shape.npc = self
-        self._collisions = []
+        physics.set_collision_type(self.shape, physics.NPC_COLLISION_TYPE)
+        self._collisions = {}
+        self._free_collisions = []
         self._time_last_collision = 0
         self._time_last_jump = 0
 
-    def attack(self, npcs):
+    def attack(self, proximity):
+        """ Attack the NPCs in proximity, a ProximityIndex, within range """
         if self.fainted() or self._sprite.current_animation_name == "attack":
             return
         self._sprite.set_animation("attack", False)
         self.non_looped_frames_remaining = (
             self._sprite.get_current_animation_total_frames()
         )
-        for npc in npcs:
-            if distance(npc.x, npc.y, self.x, self.y) < ATTACK_DISTANCE:
+        for npc in proximity.query_radius(self.x, self.y, ATTACK_DISTANCE):
+            if npc is not self:
                 npc.current_hp = max(
                     0, npc.current_hp - (self.attack_stat - npc.defense_stat)
                 )
@@ -55,17 +59,23 @@ class NPC:
                 ):
                     npc._sprite.set_animation("hurt")  # TODO: loop=False
 
-    def draw(self):
-        self._sprite.center_x = self.body.position.x
-        self._sprite.center_y = self.body.position.y
-        self._sprite.angle = math.degrees(self.body.angle)
+    def draw(self, x=None, y=None, angle=None):
+        """Draw at the body's pose, or at the given pose, e.g. interpolated
+        between simulation snapshots.
+        """
+        self._sprite.center_x = self.body.position.x if x is None else x
+        self._sprite.center_y = self.body.position.y if y is None else y
+        self._sprite.angle = math.degrees(self.body.angle if angle is None else angle)
         self._sprite.draw()
 
     def fainted(self):
         return self.current_hp <= 0
 
     def update(self, closest_celestial_body):
-        # animation related
+        self.update_animation()
+        self.update_physics(closest_celestial_body)
+
+    def update_animation(self):
         self._sprite.update()
         if not self._sprite.loop:
             self.non_looped_frames_remaining -= 1
@@ -85,7 +95,7 @@ class NPC:
         ):
             self._sprite.set_animation("idle")
 
-        # physics
+    def update_physics(self, closest_celestial_body):
         self.body.angular_velocity = 0
         if closest_celestial_body:
             polar_angle = math.atan2(
@@ -102,6 +112,19 @@ class NPC:
             ## gravity
             self.body.apply_impulse_at_local_point((0, -PLAYER_GRAVITY_IMPULSE))
 
+    def apply_gravity(self, acceleration_x, acceleration_y, delta_time):
+        """Orient feet along, and accelerate with, a gravitational field,
+        e.g. from a GravityField, instead of the closest celestial body.
+        """
+        self.body.angular_velocity = 0
+        if acceleration_x or acceleration_y:
+            self.body.angle = math.atan2(-acceleration_y, -acceleration_x) - math.pi / 2
+        velocity = self.body.velocity
+        self.body.velocity = (
+            velocity.x + acceleration_x * delta_time,
+            velocity.y + acceleration_y * delta_time,
+        )
+
     def jump(self):
         if settings.USE_SIMPLE_JUMP_PHYSICS:
             if self._collisions or time.time() - self._time_last_collision < 0.1:
@@ -109,7 +132,7 @@ class NPC:
                 self._time_last_jump = time.time()
         else:
             # more complex and right sounding, but has been less "correct"
-            for collision in self._collisions:
+            for collision in self._collisions.values():
                 if (
                     collision.shape.body is not None
                     and abs(collision.normal.x / collision.normal.y)
@@ -118,17 +141,27 @@ class NPC:
                     self.body.apply_impulse_at_local_point((0, PLAYER_JUMP_IMPULSE))
                     return
 
-    def add_collision(self, collision):
-        self._collisions.append(collision)
+    def add_collision(self, shape, normal):
+        """Track contact with shape, reusing a record from a previous
+        contact where possible.
+        """
+        collision = self._collisions.get(shape)
+        if collision is None:
+            if self._free_collisions:
+                collision = self._free_collisions.pop()
+            else:
+                collision = Collision()
+            self._collisions[shape] = collision
+        collision.npc_shape = self.shape
+        collision.shape = shape
+        collision.normal = normal
         self.last_collision = time.time()
 
     def remove_collision(self, shape):
-        to_remove = []
-        for collision in self._collisions:
-            if collision.shape == shape:
-                to_remove.append(collision)
-        for collision in to_remove:
-            self._collisions.remove(collision)
+        collision = self._collisions.pop(shape, None)
+        if collision is not None:
+            collision.shape = None
+            self._free_collisions.append(collision)
 
     @property
     def x(self):
@@ -143,12 +176,149 @@ class NPC:
         return self.body.angle
 
 
-@dataclass
+def vectors_to_array(vectors):
+    """ Return an n x 2 array from n Vec2d, faster than numpy.array(vectors) """
+    flat = itertools.chain.from_iterable(vectors)
+    return numpy.fromiter(flat, float, 2 * len(vectors)).reshape(-1, 2)
+
+
+class NPCPopulation:
+    """NPCs whose per tick physics runs as one vectorized pass. State is
+    kept in arrays, one entry per NPC. Masses are stored as NPCs join and
+    leave, while positions, velocities and angles, which pymunk integrates,
+    are gathered from the bodies once a tick. Orientation toward and gravity
+    impulse from the closest celestial body are computed for every NPC at
+    once, and the results are written back. Each NPC stays usable on its
+    own, e.g. to attack or draw.
+
+    Given a GravityField, NPCs are instead oriented along and accelerated by
+    the summed gravity of every body in it.
+    """
+
+    def __init__(self, npcs=()):
+        self.npcs = []
+        self.xs = numpy.empty(0)
+        self.ys = numpy.empty(0)
+        self.velocity_xs = numpy.empty(0)
+        self.velocity_ys = numpy.empty(0)
+        self.angles = numpy.empty(0)
+        self.masses = numpy.empty(0)
+        self.proximity = ProximityIndex(cell_size=ATTACK_DISTANCE)
+        self.extend(npcs)
+
+    def __len__(self):
+        return len(self.npcs)
+
+    def __iter__(self):
+        return iter(self.npcs)
+
+    def __getitem__(self, index):
+        return self.npcs[index]
+
+    def add(self, npc):
+        self.extend([npc])
+
+    def extend(self, npcs):
+        npcs = list(npcs)
+        self.npcs.extend(npcs)
+        self.masses = numpy.concatenate(
+            [self.masses, numpy.fromiter((npc.body.mass for npc in npcs), float)]
+        )
+
+    def remove(self, npc):
+        index = self.npcs.index(npc)
+        del self.npcs[index]
+        self.masses = numpy.delete(self.masses, index)
+
+    def npcs_within(self, x, y, radius):
+        """ Return NPCs within radius of x,y, as of the last gather """
+        return self.proximity.query_radius(x, y, radius)
+
+    def gather(self):
+        """Read the body state pymunk integrates of every NPC into the
+        population arrays, and rebuild the proximity index from positions.
+        """
+        bodies = [npc.body for npc in self.npcs]
+        positions = vectors_to_array([body.position for body in bodies])
+        velocities = vectors_to_array([body.velocity for body in bodies])
+        self.xs = positions[:, 0]
+        self.ys = positions[:, 1]
+        self.velocity_xs = velocities[:, 0]
+        self.velocity_ys = velocities[:, 1]
+        self.angles = numpy.fromiter((body.angle for body in bodies), float)
+        self.proximity.rebuild(self.npcs, self.xs, self.ys)
+
+    def update(self, galaxy, gravity_field=None, delta_time=0):
+        for npc in self.npcs:
+            npc.update_animation()
+        self.gather()
+        if not self.npcs:
+            return
+        if gravity_field is None:
+            self.apply_closest_celestial_body_gravity(galaxy)
+        else:
+            self.apply_gravity_field(gravity_field, delta_time)
+        self.scatter()
+
+    def apply_closest_celestial_body_gravity(self, galaxy):
+        (
+            celestial_body_xs,
+            celestial_body_ys,
+            found,
+        ) = galaxy.closest_celestial_body_positions(self.xs, self.ys)
+        polar_angles = numpy.arctan2(
+            self.ys - celestial_body_ys, self.xs - celestial_body_xs
+        )
+        self.angles = numpy.where(found, polar_angles - math.pi / 2, self.angles)
+        # a local (0, -impulse) at the new angle points along -polar
+        velocity_changes = numpy.where(found, PLAYER_GRAVITY_IMPULSE / self.masses, 0)
+        self.velocity_xs -= velocity_changes * numpy.cos(polar_angles)
+        self.velocity_ys -= velocity_changes * numpy.sin(polar_angles)
+
+    def apply_gravity_field(self, gravity_field, delta_time):
+        acceleration_xs, acceleration_ys = gravity_field.accelerations(self.xs, self.ys)
+        pulled = (acceleration_xs != 0) | (acceleration_ys != 0)
+        self.angles = numpy.where(
+            pulled,
+            numpy.arctan2(-acceleration_ys, -acceleration_xs) - math.pi / 2,
+            self.angles,
+        )
+        self.velocity_xs += acceleration_xs * delta_time
+        self.velocity_ys += acceleration_ys * delta_time
+
+    def scatter(self):
+        """ Write angles and velocities back to every NPC's body """
+        for npc, angle, velocity_x, velocity_y in zip(
+            self.npcs,
+            self.angles.tolist(),
+            self.velocity_xs.tolist(),
+            self.velocity_ys.tolist(),
+        ):
+            body = npc.body
+            body.angular_velocity = 0
+            body.angle = angle
+            body.velocity = velocity_x, velocity_y
+
+
 class Collision:
-    """Class for keeping track of an item in inventory."""
+    """Contact between an NPC's shape and another shape. Only the normal is
+    copied when contact begins, since the arbiter is only valid during the
+    collision callback. The contact points and surface velocity are derived
+    from the shapes when they are read. Impulses are only resolved after
+    begin, so are not tracked.
+    """
+
+    __slots__ = ("npc_shape", "shape", "normal")
 
-    contact_point_set: []
-    normal: pymunk.Vec2d
-    shape: pymunk.Shape
-    surface_velocity: pymunk.Vec2d
-    total_impulse: float
+    def __init__(self, npc_shape=None, shape=None, normal=None):
+        self.npc_shape = npc_shape
+        self.shape = shape
+        self.normal = normal
+
+    @property
+    def contact_point_set(self):
+        return self.npc_shape.shapes_collide(self.shape)
+
+    @property
+    def surface_velocity(self):
+        return self.shape.surface_velocity - self.npc_shape.surface_velocity
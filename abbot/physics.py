@@ -0,0 +1,102 @@
+import pymunk
+
+# Collision types, which collision handlers are registered against
+PLAYER_COLLISION_TYPE = 1
+NPC_COLLISION_TYPE = 2
+CELESTIAL_BODY_COLLISION_TYPE = 3
+PROJECTILE_COLLISION_TYPE = 4
+
+CELESTIAL_BODY_FRICTION = 0.5
+
+# Shape filter category bits
+PLAYER_CATEGORY = 0b0001
+NPC_CATEGORY = 0b0010
+CELESTIAL_BODY_CATEGORY = 0b0100
+PROJECTILE_CATEGORY = 0b1000
+
+# Which categories each collision type collides with. Pairs left out here,
+# e.g. celestial body vs celestial body or NPC vs NPC, are rejected by
+# pymunk's filters without calling back into Python.
+SHAPE_FILTERS = {
+    PLAYER_COLLISION_TYPE: pymunk.ShapeFilter(
+        categories=PLAYER_CATEGORY,
+        mask=NPC_CATEGORY | CELESTIAL_BODY_CATEGORY | PROJECTILE_CATEGORY,
+    ),
+    NPC_COLLISION_TYPE: pymunk.ShapeFilter(
+        categories=NPC_CATEGORY,
+        mask=PLAYER_CATEGORY | CELESTIAL_BODY_CATEGORY | PROJECTILE_CATEGORY,
+    ),
+    CELESTIAL_BODY_COLLISION_TYPE: pymunk.ShapeFilter(
+        categories=CELESTIAL_BODY_CATEGORY,
+        mask=PLAYER_CATEGORY | NPC_CATEGORY | PROJECTILE_CATEGORY,
+    ),
+    PROJECTILE_COLLISION_TYPE: pymunk.ShapeFilter(
+        categories=PROJECTILE_CATEGORY,
+        mask=PLAYER_CATEGORY | NPC_CATEGORY | CELESTIAL_BODY_CATEGORY,
+    ),
+}
+
+
+def set_collision_type(shape, collision_type):
+    """ Set the shape's collision type and the matching shape filter """
+    shape.collision_type = collision_type
+    shape.filter = SHAPE_FILTERS[collision_type]
+
+
+class CelestialBodyShapePool:
+    """Static circle shapes for celestial bodies, on the space's static body
+    and reused across chunk activations. Shapes are repositioned and resized
+    while out of the space, so reusing one allocates nothing, and a chunk's
+    shapes are added to and removed from the space in one batch.
+    """
+
+    def __init__(self, space, friction=CELESTIAL_BODY_FRICTION):
+        self.space = space
+        self.friction = friction
+        self._free_shapes = []
+
+    def __len__(self):
+        return len(self._free_shapes)
+
+    def add(self, celestial_bodies):
+        """ Add a shape for each celestial body to the space, return the shapes """
+        shapes = [self.acquire(celestial_body) for celestial_body in celestial_bodies]
+        if shapes:
+            self.space.add(*shapes)
+        return shapes
+
+    def remove(self, shapes):
+        """ Remove shapes from the space, returning them to the pool """
+        if shapes:
+            self.space.remove(*shapes)
+        for shape in shapes:
+            shape.celestial_body = None
+        self._free_shapes.extend(shapes)
+
+    def acquire(self, celestial_body):
+        position = celestial_body.x, celestial_body.y
+        if self._free_shapes:
+            shape = self._free_shapes.pop()
+            shape.unsafe_set_radius(celestial_body.radius)
+            shape.unsafe_set_offset(position)
+        else:
+            shape = pymunk.Circle(
+                self.space.static_body, celestial_body.radius, position
+            )
+            shape.friction = self.friction
+            set_collision_type(shape, CELESTIAL_BODY_COLLISION_TYPE)
+        shape.celestial_body = celestial_body
+        return shape
+
+
+class ChunkBinding:
+    """A chunk materialized in the physics space: its celestial bodies'
+    shapes, index aligned with chunk.celestial_bodies. Each shape refers back
+    to its celestial body as shape.celestial_body.
+    """
+
+    __slots__ = ("chunk", "shapes")
+
+    def __init__(self, chunk, shapes):
+        self.chunk = chunk
+        self.shapes = shapes
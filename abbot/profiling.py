@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from collections import deque
+
+import numpy
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Record per phase frame timings into ring buffers of the last capacity
+    samples, and summarize them as rolling percentiles.
+
+    Timing a frame is start() followed by lap(phase) after each phase, so
+    each sample is the time since the previous lap. Callers hold None rather
+    than a profiler when profiling is disabled, which costs one truthiness
+    check per phase.
+
+    Laps are timed per thread, so a simulation thread and the render thread
+    can share one profiler.
+    """
+
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.timings = {}
+        self._local = threading.local()
+
+    def start(self):
+        self._local.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.record(phase, now - getattr(self._local, "last", now))
+        self._local.last = now
+
+    def record(self, phase, seconds):
+        timings = self.timings.get(phase)
+        if timings is None:
+            timings = self.timings[phase] = deque(maxlen=self.capacity)
+        timings.append(seconds)
+
+    def percentiles(self, phase, percentiles=PERCENTILES):
+        """ Return the given percentiles of the phase timings, in seconds """
+        timings = self.timings.get(phase)
+        if not timings:
+            return [0] * len(percentiles)
+        # copy first, another thread may be recording
+        return list(numpy.percentile(numpy.array(list(timings)), percentiles))
+
+    def summary(self):
+        """ Return {phase: {"p50": seconds, ...}} for every recorded phase """
+        return {
+            phase: dict(
+                zip(
+                    (f"p{percentile}" for percentile in PERCENTILES),
+                    self.percentiles(phase),
+                )
+            )
+            for phase in list(self.timings)
+        }
+
+    def dump(self, path):
+        """ Write the summary and raw samples, in seconds, as JSON """
+        with open(path, "w") as dump_file:
+            json.dump(
+                {
+                    "summary": self.summary(),
+                    "samples": {
+                        phase: list(timings)
+                        for phase, timings in list(self.timings.items())
+                    },
+                },
+                dump_file,
+                indent=2,
+            )
+
+    def clear(self):
+        self.timings.clear()
+
+    def __str__(self):
+        lines = [f"{'phase':24}{'p50':>9}{'p95':>9}{'p99':>9} ms"]
+        for phase, percentiles in self.summary().items():
+            lines.append(
+                f"{phase:24}"
+                + "".join(f"{percentiles[key] * 1000:9.3f}" for key in percentiles)
+            )
+        return "\n".join(lines)
@@ -0,0 +1,66 @@
+import numpy
+
+# Cell coordinates are offset to be non negative and packed into one int64
+# key, so cell keys sort by column then row.
+CELL_COORDINATE_OFFSET = 2 ** 30
+
+
+class ProximityIndex:
+    """Spatial hash of items at points, for radius queries such as attack
+    range, area of effect and aggro checks. The index is rebuilt wholesale
+    from position arrays, as one vectorized sort of packed cell keys, which
+    is cheap enough to do every tick.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.items = []
+        self.xs = numpy.empty(0)
+        self.ys = numpy.empty(0)
+        self._keys = numpy.empty(0, numpy.int64)
+        self._order = numpy.empty(0, numpy.int64)
+
+    def __len__(self):
+        return len(self.items)
+
+    def rebuild(self, items, xs, ys):
+        """ Index items, where item i is at xs[i],ys[i] """
+        self.items = list(items)
+        self.xs = numpy.asarray(xs, dtype=float)
+        self.ys = numpy.asarray(ys, dtype=float)
+        keys = self._cell_keys(
+            numpy.floor_divide(self.xs, self.cell_size).astype(numpy.int64),
+            numpy.floor_divide(self.ys, self.cell_size).astype(numpy.int64),
+        )
+        self._order = numpy.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def query_radius(self, x, y, radius):
+        """ Return the items strictly within radius of x,y """
+        if not self.items:
+            return []
+        min_cell_x = int((x - radius) // self.cell_size)
+        max_cell_x = int((x + radius) // self.cell_size)
+        min_cell_y = int((y - radius) // self.cell_size)
+        max_cell_y = int((y + radius) // self.cell_size)
+        column_xs = numpy.arange(min_cell_x, max_cell_x + 1, dtype=numpy.int64)
+        starts = numpy.searchsorted(
+            self._keys, self._cell_keys(column_xs, min_cell_y), side="left"
+        )
+        ends = numpy.searchsorted(
+            self._keys, self._cell_keys(column_xs, max_cell_y), side="right"
+        )
+        candidates = numpy.concatenate(
+            [self._order[start:end] for start, end in zip(starts, ends)]
+        )
+        distances_squared = (self.xs[candidates] - x) ** 2 + (
+            self.ys[candidates] - y
+        ) ** 2
+        within = candidates[distances_squared < radius * radius]
+        return [self.items[i] for i in numpy.sort(within)]
+
+    @staticmethod
+    def _cell_keys(cell_xs, cell_ys):
+        return ((cell_xs + CELL_COORDINATE_OFFSET) << 32) | (
+            cell_ys + CELL_COORDINATE_OFFSET
+        )
@@ -0,0 +1,200 @@
+"""Record a Driver's inputs to a compact binary log and replay them headless,
+as fast as possible, e.g.
+
+    python -m abbot.replay session.rpl
+    python -m abbot.replay session.rpl --no-check
+
+A log is a header of the galaxy seed and initial timestep, then one flags
+byte per tick of which inputs were set, followed by the tick's timestep
+only if it changed, and a hash of the resulting state every hash_interval
+ticks. Replay checks those hashes, so divergence is caught at the first
+hashed tick after it happens.
+"""
+import argparse
+import hashlib
+import struct
+import sys
+import time
+
+from abbot.galaxy.rng import seed_from_u64, seed_to_u64
+
+MAGIC = b"ABRP"
+VERSION = 1
+# magic, version, galaxy seed, initial timestep
+HEADER = struct.Struct("<4sHQd")
+TIMESTEP = struct.Struct("<d")
+STATE_HASH = struct.Struct("<Q")
+DEFAULT_HASH_INTERVAL = 60
+
+# Tick flag bits
+MOVING_LEFT = 0x01
+MOVING_RIGHT = 0x02
+ATTACK = 0x04
+JUMP = 0x08
+HAS_STATE_HASH = 0x40
+HAS_TIMESTEP = 0x80
+
+
+def input_flags(driver):
+    return (
+        (MOVING_LEFT if driver.moving_left else 0)
+        | (MOVING_RIGHT if driver.moving_right else 0)
+        | (ATTACK if driver.do_attack else 0)
+        | (JUMP if driver.do_jump else 0)
+    )
+
+
+def apply_input_flags(driver, flags):
+    driver.moving_left = bool(flags & MOVING_LEFT)
+    driver.moving_right = bool(flags & MOVING_RIGHT)
+    driver.do_attack = bool(flags & ATTACK)
+    driver.do_jump = bool(flags & JUMP)
+
+
+def state_hash(driver):
+    """ Return a 64 bit hash of the player and NPC physics state and hp """
+    digest = hashlib.blake2b(digest_size=STATE_HASH.size)
+    for npc in [driver.player, *driver.npcs]:
+        body = npc.body
+        digest.update(
+            struct.pack(
+                "<6dq",
+                *body.position,
+                *body.velocity,
+                body.angle,
+                body.angular_velocity,
+                npc.current_hp,
+            )
+        )
+    return STATE_HASH.unpack(digest.digest())[0]
+
+
+class ReplayRecorder:
+    """Append a Driver's per tick inputs to a replay log. Driver calls
+    record_inputs before each tick and record_state after it.
+    """
+
+    def __init__(self, path, seed, hash_interval=DEFAULT_HASH_INTERVAL):
+        self.path = path
+        self.seed = seed
+        self.hash_interval = hash_interval
+        self.tick = 0
+        self.timestep = None
+        self._state_hash_due = False
+        self._file = open(path, "wb")
+
+    def record_inputs(self, driver, delta_time):
+        if self.timestep is None:
+            self.timestep = delta_time
+            self._file.write(
+                HEADER.pack(MAGIC, VERSION, seed_to_u64(self.seed), delta_time)
+            )
+        flags = input_flags(driver)
+        self.tick += 1
+        if self.hash_interval and self.tick % self.hash_interval == 0:
+            flags |= HAS_STATE_HASH
+        if delta_time != self.timestep:
+            self.timestep = delta_time
+            self._file.write(bytes((flags | HAS_TIMESTEP,)))
+            self._file.write(TIMESTEP.pack(delta_time))
+        else:
+            self._file.write(bytes((flags,)))
+        self._state_hash_due = flags & HAS_STATE_HASH
+
+    def record_state(self, driver):
+        if self._state_hash_due:
+            self._file.write(STATE_HASH.pack(state_hash(driver)))
+
+    def close(self):
+        self._file.close()
+
+
+class ReplayLog:
+    """ A replay log read into memory, iterable as ticks """
+
+    def __init__(self, data):
+        magic, version, seed, self.timestep = HEADER.unpack_from(data)
+        self.seed = seed_from_u64(seed)
+        if magic != MAGIC:
+            raise ValueError("Not a replay log")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay log version {version}")
+        self.data = data
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as log_file:
+            return cls(log_file.read())
+
+    def __iter__(self):
+        """Yield (flags, timestep, state hash or None) per tick, stopping at
+        a truncated final tick, e.g. from a session that crashed.
+        """
+        data = self.data
+        offset = HEADER.size
+        timestep = self.timestep
+        while offset < len(data):
+            flags = data[offset]
+            end = offset + 1
+            end += TIMESTEP.size if flags & HAS_TIMESTEP else 0
+            end += STATE_HASH.size if flags & HAS_STATE_HASH else 0
+            if end > len(data):
+                return
+            offset += 1
+            if flags & HAS_TIMESTEP:
+                (timestep,) = TIMESTEP.unpack_from(data, offset)
+                offset += TIMESTEP.size
+            expected_hash = None
+            if flags & HAS_STATE_HASH:
+                (expected_hash,) = STATE_HASH.unpack_from(data, offset)
+                offset += STATE_HASH.size
+            yield flags, timestep, expected_hash
+
+
+def replay(driver, log, check=True):
+    """Feed a replay log through a driver, which should be fresh and built
+    with the log's seed. Return the ticks run, the elapsed wall time, and the
+    first tick whose state hash differed from the log, or None.
+    """
+    diverged_tick = None
+    ticks = 0
+    start = time.perf_counter()
+    for flags, timestep, expected_hash in log:
+        apply_input_flags(driver, flags)
+        driver.update(timestep)
+        ticks += 1
+        if (
+            check
+            and expected_hash is not None
+            and diverged_tick is None
+            and state_hash(driver) != expected_hash
+        ):
+            diverged_tick = ticks
+    return ticks, time.perf_counter() - start, diverged_tick
+
+
+def main():
+    # imported here, since the driver imports this module to record
+    from abbot.driver import Driver
+
+    parser = argparse.ArgumentParser(description="Replay a recorded session")
+    parser.add_argument("log", help="replay log file")
+    parser.add_argument(
+        "--no-check", action="store_true", help="skip state hash checks"
+    )
+    args = parser.parse_args()
+
+    log = ReplayLog.from_file(args.log)
+    driver = Driver(log.seed)
+    try:
+        ticks, elapsed, diverged_tick = replay(driver, log, check=not args.no_check)
+    finally:
+        driver.close()
+    print(f"{ticks} ticks in {elapsed:.3f}s, {ticks / elapsed:.1f} ticks/s")
+    if diverged_tick is not None:
+        print(f"State diverged from the recording by tick {diverged_tick}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,17 @@ import os
 
 
 USE_SIMPLE_JUMP_PHYSICS = bool(os.environ.get("USE_SIMPLE_JUMP_PHYSICS", "True"))
+PREFETCH_CHUNKS = os.environ.get("PREFETCH_CHUNKS", "True").lower() == "true"
+PREFETCH_LOOK_AHEAD_RING = int(os.environ.get("PREFETCH_LOOK_AHEAD_RING", "1"))
+PREFETCH_INTEGRATION_BUDGET = int(os.environ.get("PREFETCH_INTEGRATION_BUDGET", "1"))
+PREFETCH_INTEGRATION_DELAY = int(os.environ.get("PREFETCH_INTEGRATION_DELAY", "10"))
+PROFILE_FRAMES = os.environ.get("PROFILE_FRAMES", "False").lower() == "true"
+TRACE = os.environ.get("ABBOT_TRACE", "")
+CHUNK_STORE_PATH = os.environ.get("CHUNK_STORE_PATH", "")
+PHYSICS_CHUNK_RADIUS = int(os.environ.get("PHYSICS_CHUNK_RADIUS", "1"))
+FAR_FIELD_CHUNK_RADIUS = int(os.environ.get("FAR_FIELD_CHUNK_RADIUS", "3"))
+GRAVITY_FIELD = os.environ.get("GRAVITY_FIELD", "False").lower() == "true"
+GRAVITY_FIELD_THETA = float(os.environ.get("GRAVITY_FIELD_THETA", "0.5"))
+SIMULATION_THREAD = os.environ.get("SIMULATION_THREAD", "False").lower() == "true"
+SIMULATION_TICK_RATE = int(os.environ.get("SIMULATION_TICK_RATE", "60"))
+REPLAY_DIRECTORY = os.environ.get("REPLAY_DIRECTORY", "")
@@ -0,0 +1,120 @@
+"""Headless simulation runner. Steps Driver.update at a fixed timestep as
+fast as possible, without a window or GL context, e.g.
+
+    python -m abbot.sim --ticks 100000 --seed 42
+    python -m abbot.sim --ticks 5000 --script inputs.txt
+    python -m abbot.sim --ticks 5000 --seed 42 --record session.rpl
+    python -m abbot.sim --ticks 5000 --restore heavy.snap --snapshot soak.snap
+"""
+import argparse
+import random
+import time
+
+from abbot import snapshot
+from abbot.driver import Driver
+
+DEFAULT_TIMESTEP = 1 / 60
+
+
+class RandomInput:
+    """ Random player input, reproducible from its seed """
+
+    def __init__(self, seed=None, change_probability=0.05):
+        self.random = random.Random(seed)
+        self.change_probability = change_probability
+
+    def apply(self, driver, tick):
+        if self.random.random() < self.change_probability:
+            direction = self.random.choice(["left", "right", None])
+            driver.moving_left = direction == "left"
+            driver.moving_right = direction == "right"
+        if self.random.random() < self.change_probability:
+            driver.do_jump = True
+        if self.random.random() < self.change_probability:
+            driver.do_attack = True
+
+
+class ScriptedInput:
+    """Player input from a script, one "<tick> <command>" per line, where
+    command is one of left, right, stop, jump or attack. Blank lines and
+    lines starting with # are ignored.
+    """
+
+    COMMANDS = ("left", "right", "stop", "jump", "attack")
+
+    def __init__(self, lines):
+        self.commands = {}
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            tick, command = line.split()
+            if command not in self.COMMANDS:
+                raise ValueError(f"Unknown input command {command}")
+            self.commands.setdefault(int(tick), []).append(command)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as script:
+            return cls(script.readlines())
+
+    def apply(self, driver, tick):
+        for command in self.commands.get(tick, ()):
+            if command == "left":
+                driver.moving_left, driver.moving_right = True, False
+            elif command == "right":
+                driver.moving_left, driver.moving_right = False, True
+            elif command == "stop":
+                driver.moving_left = driver.moving_right = False
+            elif command == "jump":
+                driver.do_jump = True
+            elif command == "attack":
+                driver.do_attack = True
+
+
+def run(driver, ticks, timestep=DEFAULT_TIMESTEP, input_source=None):
+    """ Step the driver for the given ticks, return elapsed wall time """
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if input_source:
+            input_source.apply(driver, tick)
+        driver.update(timestep)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulation headless")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--timestep", type=float, default=DEFAULT_TIMESTEP)
+    parser.add_argument("--seed", type=int, default=None, help="galaxy seed")
+    parser.add_argument("--input-seed", type=int, default=None)
+    parser.add_argument("--script", help="scripted input file, random if unset")
+    parser.add_argument("--record", help="replay log to record the run to")
+    parser.add_argument("--restore", help="snapshot to start the run from")
+    parser.add_argument("--snapshot", help="snapshot to save the end of the run to")
+    args = parser.parse_args()
+    if args.restore and args.record:
+        # replay logs always start from a fresh galaxy at tick 0
+        parser.error("--record cannot be combined with --restore")
+
+    if args.script:
+        input_source = ScriptedInput.from_file(args.script)
+    else:
+        input_source = RandomInput(args.input_seed)
+    driver = snapshot.restore_file(args.restore) if args.restore else Driver(args.seed)
+    if args.record:
+        driver.record(args.record)
+    try:
+        elapsed = run(driver, args.ticks, args.timestep, input_source)
+        if args.snapshot:
+            snapshot.save_file(driver, args.snapshot)
+    finally:
+        driver.close()
+    print(
+        f"{args.ticks} ticks in {elapsed:.3f}s, {args.ticks / elapsed:.1f} ticks/s, "
+        f"{args.ticks * args.timestep / elapsed:.1f}x real time"
+    )
+
+
+if __name__ == "__main__":
+    main()
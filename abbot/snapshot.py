@@ -0,0 +1,202 @@
+"""Save a Driver's simulation state to a compact binary snapshot, and
+restore a Driver from one, e.g. to checkpoint soak tests and start straight
+from a heavy scenario.
+
+A snapshot is a header, a table of the sprite and animation names NPCs use,
+one fixed size record per NPC, player first, then every modified chunk as
+its coordinates followed by its chunk store record. Unmodified chunks are
+regenerated from the galaxy seed, so are not stored.
+
+Contacts are not stored. The restored space finds them again on its first
+step, so a restored run follows the original closely, but not bit for bit.
+"""
+import struct
+
+import numpy
+
+from abbot.driver import Driver, create_galaxy
+from abbot.galaxy.chunk_store import RECORD_HEADER, decode_chunk, encode_chunk
+from abbot.galaxy.rng import seed_from_u64, seed_to_u64
+from abbot.npc import NPC
+from abbot.replay import apply_input_flags, input_flags
+
+MAGIC = b"ABSN"
+VERSION = 1
+# magic, version, galaxy seed, ticks, NPCs, modified chunks, input flags
+HEADER = struct.Struct("<4sHQqIIB")
+NAME_COUNT = struct.Struct("<H")
+NAME_LENGTH = struct.Struct("<H")
+CHUNK_COORDINATES = struct.Struct("<qq")
+NPC_DTYPE = numpy.dtype(
+    [
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("velocity_x", "<f8"),
+        ("velocity_y", "<f8"),
+        ("angle", "<f8"),
+        ("angular_velocity", "<f8"),
+        ("hp", "<i8"),
+        ("current_hp", "<i8"),
+        ("attack_stat", "<i8"),
+        ("defense_stat", "<i8"),
+        ("scale", "<f8"),
+        ("sprite_name", "<u2"),
+        ("animation_name", "<u2"),
+        ("current_frame", "<u4"),
+        ("non_looped_frames_remaining", "<i4"),
+        ("loop", "u1"),
+        ("face_direction", "u1"),
+    ]
+)
+
+
+def save(driver):
+    """ Return a snapshot of the driver's simulation state, as bytes """
+    npcs = [driver.player, *driver.npcs]
+    names = {}
+
+    def name_index(name):
+        return names.setdefault(name, len(names))
+
+    records = numpy.array(
+        [
+            (
+                *npc.body.position,
+                *npc.body.velocity,
+                npc.body.angle,
+                npc.body.angular_velocity,
+                npc.hp,
+                npc.current_hp,
+                npc.attack_stat,
+                npc.defense_stat,
+                npc._sprite.scale,
+                name_index(npc._sprite.sprite_name),
+                name_index(npc._sprite.current_animation_name),
+                npc._sprite.current_frame,
+                npc.non_looped_frames_remaining,
+                npc._sprite.loop,
+                npc._sprite.character_face_direction,
+            )
+            for npc in npcs
+        ],
+        dtype=NPC_DTYPE,
+    )
+    modified_chunks = list(driver.galaxy.modified_chunks.values())
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            seed_to_u64(driver.galaxy.seed),
+            driver.ticks,
+            len(npcs),
+            len(modified_chunks),
+            input_flags(driver),
+        ),
+        NAME_COUNT.pack(len(names)),
+    ]
+    for name in names:
+        encoded = name.encode("utf8")
+        parts.append(NAME_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    parts.append(records.tobytes())
+    for chunk in modified_chunks:
+        parts.append(CHUNK_COORDINATES.pack(chunk.chunk_x, chunk.chunk_y))
+        parts.append(encode_chunk(chunk))
+    return b"".join(parts)
+
+
+def restore(data):
+    """Return a new Driver in the state a snapshot was saved in. Modified
+    chunks and the player are restored before any chunk is activated, so
+    chunks are only ever activated around the restored player, and every
+    NPC is added to the space in one batch.
+    """
+    (
+        magic,
+        version,
+        seed,
+        ticks,
+        npc_count,
+        modified_chunk_count,
+        flags,
+    ) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    offset = HEADER.size
+    (name_count,) = NAME_COUNT.unpack_from(data, offset)
+    offset += NAME_COUNT.size
+    names = []
+    for _ in range(name_count):
+        (length,) = NAME_LENGTH.unpack_from(data, offset)
+        offset += NAME_LENGTH.size
+        names.append(bytes(data[offset : offset + length]).decode("utf8"))
+        offset += length
+    records = numpy.frombuffer(data, NPC_DTYPE, npc_count, offset)
+    offset += records.nbytes
+
+    galaxy = create_galaxy(seed_from_u64(seed))
+    for _ in range(modified_chunk_count):
+        chunk_x, chunk_y = CHUNK_COORDINATES.unpack_from(data, offset)
+        offset += CHUNK_COORDINATES.size
+        (count,) = RECORD_HEADER.unpack_from(data, offset)
+        galaxy.mark_modified(
+            galaxy.chunk_from_arrays(chunk_x, chunk_y, *decode_chunk(data, offset))
+        )
+        offset += RECORD_HEADER.size + count * 3 * 8
+
+    npcs = []
+    for record in records.tolist():
+        npc = NPC(names[record[11]], scale=record[10])
+        restore_npc(npc, record, names)
+        npcs.append(npc)
+    driver = Driver(galaxy=galaxy, player=npcs[0])
+    driver.ticks = ticks
+    apply_input_flags(driver, flags)
+    driver.add_npcs(npcs[1:])
+    return driver
+
+
+def restore_npc(npc, record, names):
+    """ Set an NPC's body, hp and animation state from an NPC_DTYPE record """
+    (
+        x,
+        y,
+        velocity_x,
+        velocity_y,
+        angle,
+        angular_velocity,
+        npc.hp,
+        npc.current_hp,
+        npc.attack_stat,
+        npc.defense_stat,
+        _,
+        _,
+        animation_name,
+        current_frame,
+        npc.non_looped_frames_remaining,
+        loop,
+        face_direction,
+    ) = record
+    body = npc.body
+    body.position = x, y
+    body.velocity = velocity_x, velocity_y
+    body.angle = angle
+    body.angular_velocity = angular_velocity
+    sprite = npc._sprite
+    sprite.current_animation_name = names[animation_name]
+    sprite.current_frame = current_frame
+    sprite.loop = bool(loop)
+    sprite.character_face_direction = face_direction
+    sprite.texture = sprite.get_current_texture()
+
+
+def save_file(driver, path):
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(save(driver))
+
+
+def restore_file(path):
+    with open(path, "rb") as snapshot_file:
+        return restore(snapshot_file.read())
@@ -0,0 +1,125 @@
+"""Structured event tracing. Events have a category, e.g. "physics", and a
+level, and are only recorded if the category is enabled at that level, e.g.
+ABBOT_TRACE="physics:debug,galaxy:info". A disabled event costs a function
+call and a dict lookup. Enabled events are queued unformatted and formatted
+and written in bulk by a background writer thread.
+"""
+import atexit
+import queue
+import sys
+import threading
+import time
+
+from abbot import settings
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+DISABLED = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {level: name.upper() for name, level in LEVELS.items()}
+
+PHYSICS = "physics"
+GALAXY = "galaxy"
+ANIMATION = "animation"
+
+# Maximum events formatted into a single write
+WRITE_BATCH_SIZE = 1024
+
+_levels = {}
+
+
+class TraceWriter:
+    """Background thread writing queued events to a stream in batches. One
+    writer serves the process, and reconfiguring swaps its stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, event):
+        if self._thread is None:
+            self._start()
+        self._queue.put(event)
+
+    def flush(self):
+        """ Block until every queued event has been written """
+        if self._thread is not None:
+            self._queue.join()
+
+    def set_stream(self, stream):
+        """ Write events queued from now on to stream """
+        self.flush()
+        with self._lock:
+            self.stream = stream
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            events = [self._queue.get()]
+            while len(events) < WRITE_BATCH_SIZE:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                stream = self.stream
+            stream.write("".join(format_event(*event) for event in events))
+            stream.flush()
+            for _ in events:
+                self._queue.task_done()
+
+
+def format_event(timestamp, category, level, message, args):
+    if args:
+        message = message % args
+    return f"{timestamp:.6f} {LEVEL_NAMES.get(level, level)} {category}: {message}\n"
+
+
+def configure(spec, stream=None):
+    """Enable categories from a spec like "physics:debug,galaxy", where a
+    category without a level is enabled at info. Replaces the previous
+    configuration. Events are written to stream, stderr by default.
+    """
+    flush()
+    _levels.clear()
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        category, _, level = entry.partition(":")
+        _levels[category] = LEVELS[level.lower()] if level else INFO
+    _writer.set_stream(stream or sys.stderr)
+
+
+def enabled(category, level=DEBUG):
+    """ Guard for call sites whose arguments are expensive to build """
+    return level >= _levels.get(category, DISABLED)
+
+
+def event(category, level, message, *args):
+    """Record an event if its category is enabled at level. message is
+    formatted with args by the writer, so callers should not preformat it.
+    """
+    if level >= _levels.get(category, DISABLED):
+        _writer.put((time.time(), category, level, message, args))
+
+
+def flush():
+    _writer.flush()
+
+
+_writer = TraceWriter(sys.stderr)
+configure(settings.TRACE)
+atexit.register(flush)
@@ -1,5 +1,7 @@
 import arcade
 
+from abbot import trace
+
 UPDATES_PER_FRAME = 7
 
 # Constants used to track if the player is facing left or right
@@ -13,20 +15,42 @@ ANIMATION_TUPLES = {
 ANIMATION_DEFAULT = [("idle", 1)]
 
 
-def load_texture_pair(filename):
-    """ Load a texture pair, with the second being a mirror image. """
-    return [
-        arcade.load_texture(filename),
-        arcade.load_texture(filename, flipped_horizontally=True),
-    ]
+class TextureRegistry:
+    """Process wide cache of animation frame textures, keyed by sprite name,
+    animation, frame and facing. Frames are only loaded from disk the first
+    time any sprite shows them, and are then shared by every sprite.
+    """
+
+    def __init__(self):
+        self._textures = {}
+
+    def __len__(self):
+        return len(self._textures)
+
+    def texture(self, sprite_name, animation_name, frame, facing):
+        key = (sprite_name, animation_name, frame, facing)
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = arcade.load_texture(
+                f"images/npcs/{sprite_name}/{animation_name}{frame}.png",
+                flipped_horizontally=facing == LEFT_FACING,
+            )
+            self._textures[key] = texture
+        return texture
+
+    def clear(self):
+        self._textures.clear()
+
+
+texture_registry = TextureRegistry()
 
 
 class AnimatedSprite(arcade.Sprite):
     def __init__(self, sprite_name, scale=1):
         """ sprite_name folder containing sprite, e.g. kingkrool """
         super().__init__(scale=scale)
-        animation_name_frames_tuples = ANIMATION_TUPLES.get(
-            sprite_name, ANIMATION_DEFAULT
+        self.animation_frames = dict(
+            ANIMATION_TUPLES.get(sprite_name, ANIMATION_DEFAULT)
         )
         self.sprite_name = sprite_name
 
@@ -38,18 +62,7 @@ class AnimatedSprite(arcade.Sprite):
         self.current_frame = 0
         self.loop = True
 
-        # Load textures
-        self.animation_name_texture_pairs = {}
-        for animation_name, frames in animation_name_frames_tuples:
-            self.animation_name_texture_pairs[animation_name] = []
-            animation_textures = self.animation_name_texture_pairs[animation_name]
-            for i in range(frames):
-                animation_textures.append(
-                    load_texture_pair(
-                        f"images/npcs/{sprite_name}/{animation_name}{i}.png"
-                    )
-                )
-        self.texture = self.get_current_animation()[0][self.character_face_direction]
+        self.texture = self.get_current_texture()
 
     def update(self):
         super().update()
@@ -61,30 +74,46 @@ class AnimatedSprite(arcade.Sprite):
 
         # Animation
         self.current_frame += 1
-        current_animation = self.get_current_animation()
-        if self.current_frame // UPDATES_PER_FRAME >= len(current_animation):
+        if (
+            self.current_frame // UPDATES_PER_FRAME
+            >= self.animation_frames[self.current_animation_name]
+        ):
             self.current_frame = 0
             if not self.loop:
                 self.set_animation("idle")
-        self.texture = current_animation[self.current_frame // UPDATES_PER_FRAME][
-            self.character_face_direction
-        ]
-
-    def get_current_animation(self):
-        return self.animation_name_texture_pairs[self.current_animation_name]
+        self.texture = self.get_current_texture()
+
+    def get_current_texture(self):
+        return texture_registry.texture(
+            self.sprite_name,
+            self.current_animation_name,
+            self.current_frame // UPDATES_PER_FRAME,
+            self.character_face_direction,
+        )
 
     def get_current_animation_total_frames(self):
-        return len(self.get_current_animation()) * UPDATES_PER_FRAME
+        return self.animation_frames[self.current_animation_name] * UPDATES_PER_FRAME
 
     def set_animation(self, animation_name, loop=True):
         if not self.has_animation(animation_name):
-            print(f"Animation {animation_name} not in sprite {self.sprite_name}")
+            trace.event(
+                trace.ANIMATION,
+                trace.WARNING,
+                "Animation %s not in sprite %s",
+                animation_name,
+                self.sprite_name,
+            )
             return
         if self.current_animation_name == animation_name:
-            print(f"Animation {animation_name} already active")
+            trace.event(
+                trace.ANIMATION,
+                trace.DEBUG,
+                "Animation %s already active",
+                animation_name,
+            )
         self.current_animation_name = animation_name
         self.current_frame = 0
         self.loop = loop
 
     def has_animation(self, animation_name):
-        return animation_name in self.animation_name_texture_pairs
+        return animation_name in self.animation_frames
@@ -0,0 +1,105 @@
+import arcade
+
+CELESTIAL_BODY_COLOR = arcade.color.YELLOW
+CELESTIAL_BODY_SEGMENTS = 128
+FAR_FIELD_COLOR = arcade.color.DARK_YELLOW
+FAR_FIELD_SEGMENTS = 16
+
+
+def far_field_zoom(galaxy, screen_width, screen_height):
+    """Return the world units per pixel at which the whole far field around
+    the player fits on screen, for drawing it as a zoomed out backdrop.
+    """
+    far_field_width = (2 * galaxy.far_field_radius + 1) * galaxy.chunk_width
+    return far_field_width / min(screen_width, screen_height)
+
+
+class ChunkRenderer:
+    """Retained render layer for the world. Each active chunk's celestial
+    bodies are built once into a shape list, the first time the chunk is
+    drawn after activating, and released when it deactivates. Only shape
+    lists whose bounds intersect the viewport are drawn, so draw calls scale
+    with visible chunks rather than celestial bodies.
+
+    Anything with chunk coordinates and xs, ys and radii arrays can be drawn,
+    so the same renderer draws the far field backdrop, with a cheaper color
+    and segment count.
+    """
+
+    def __init__(
+        self, color=CELESTIAL_BODY_COLOR, num_segments=CELESTIAL_BODY_SEGMENTS
+    ):
+        self.color = color
+        self.num_segments = num_segments
+        self._chunk_batches = {}
+        self._chunk_lists = ()
+
+    def __len__(self):
+        return len(self._chunk_batches)
+
+    def update(self, *chunk_lists):
+        """ Track chunks new to the given lists, release batches of the rest """
+        if len(chunk_lists) == len(self._chunk_lists) and all(
+            chunks is last_chunks
+            for chunks, last_chunks in zip(chunk_lists, self._chunk_lists)
+        ):
+            return
+        self._chunk_lists = chunk_lists
+        chunks_by_coordinates = {
+            (chunk.chunk_x, chunk.chunk_y): chunk
+            for chunks in chunk_lists
+            for chunk in chunks
+        }
+        for chunk_coordinates, batch in list(self._chunk_batches.items()):
+            if chunks_by_coordinates.get(chunk_coordinates) is not batch[0]:
+                del self._chunk_batches[chunk_coordinates]
+        for chunk_coordinates, chunk in chunks_by_coordinates.items():
+            if chunk_coordinates not in self._chunk_batches:
+                self._chunk_batches[chunk_coordinates] = [
+                    chunk,
+                    self.chunk_bounds(chunk),
+                    None,
+                ]
+
+    def draw(self, left, bottom, right, top):
+        """ Draw the batches of chunks intersecting the given viewport """
+        for batch in self._chunk_batches.values():
+            chunk, bounds, shape_list = batch
+            chunk_left, chunk_bottom, chunk_right, chunk_top = bounds
+            if (
+                chunk_right < left
+                or chunk_left > right
+                or chunk_top < bottom
+                or chunk_bottom > top
+            ):
+                continue
+            if shape_list is None:
+                shape_list = batch[2] = self.create_shape_list(chunk)
+            shape_list.draw()
+
+    @staticmethod
+    def chunk_bounds(chunk):
+        """ Return left, bottom, right, top bounding all celestial bodies """
+        if not len(chunk.radii):
+            return chunk.center_x, chunk.center_y, chunk.center_x, chunk.center_y
+        return (
+            float((chunk.xs - chunk.radii).min()),
+            float((chunk.ys - chunk.radii).min()),
+            float((chunk.xs + chunk.radii).max()),
+            float((chunk.ys + chunk.radii).max()),
+        )
+
+    def create_shape_list(self, chunk):
+        shape_list = arcade.ShapeElementList()
+        for x, y, radius in zip(chunk.xs, chunk.ys, chunk.radii):
+            shape_list.append(
+                arcade.create_ellipse_filled(
+                    x,
+                    y,
+                    radius * 2,
+                    radius * 2,
+                    self.color,
+                    num_segments=self.num_segments,
+                )
+            )
+        return shape_list
@@ -1,16 +1,34 @@
+import os
 import random
+import time
 from typing import Optional
 
 import arcade
 import pymunk
 
+from abbot import settings, snapshot
+from abbot.fixed_step import FixedStepSimulation
 from abbot.math import distance
 from abbot.npc import NPC, ATTACK_DISTANCE
 from abbot.driver import Driver
+from abbot.profiling import FrameProfiler
+from abbot.ui.chunk_renderer import (
+    ChunkRenderer,
+    FAR_FIELD_COLOR,
+    FAR_FIELD_SEGMENTS,
+    far_field_zoom,
+)
+from abbot.ui.minimap import MAX_ZOOM, MARGIN, MinimapOverlay, MinimapTiles
 
 SCREEN_TITLE = "Abbot"
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 1024
+FRAME_TIMINGS_PATH = "frame_timings.json"
+SNAPSHOT_PATH = "quicksave.snap"
+# NPCs this far outside the window are still drawn, so sprites do not pop
+NPC_DRAW_MARGIN = 128
+# Frames between refreshes of the frame timing overlay text
+FRAME_TIMINGS_OVERLAY_REFRESH = 30
 
 
 class GameplayWindow(arcade.Window):
@@ -21,13 +39,75 @@ class GameplayWindow(arcade.Window):
     def setup(self):
         self.view_left = -SCREEN_WIDTH // 2
         self.view_bottom = -SCREEN_HEIGHT // 2
-        self.driver = Driver()
+        self.start_driver()
+        self.chunk_renderer = ChunkRenderer()
+        self.far_field_renderer = ChunkRenderer(
+            color=FAR_FIELD_COLOR, num_segments=FAR_FIELD_SEGMENTS
+        )
+        self.minimap = MinimapOverlay(self.minimap_tiles)
+        self.show_minimap = True
+        self.minimap_zoom = 0
+        self.show_frame_timings = False
+        self.frame_timings_text = ""
+        self.frames_drawn = 0
+
+    def start_driver(self, driver=None):
+        """ Start simulating driver, or a new Driver if None """
+        self.driver = driver if driver is not None else Driver()
+        if settings.REPLAY_DIRECTORY and not self.driver.ticks:
+            self.driver.record(
+                os.path.join(
+                    settings.REPLAY_DIRECTORY,
+                    time.strftime("replay-%Y%m%d-%H%M%S.rpl"),
+                )
+            )
+        self.simulation = FixedStepSimulation(
+            self.driver, timestep=1 / settings.SIMULATION_TICK_RATE
+        )
+        if settings.SIMULATION_THREAD:
+            self.simulation.start()
+        self.minimap_tiles = MinimapTiles(
+            self.driver.galaxy.seed, self.driver.galaxy.chunk_width
+        )
+
+    def restart_driver(self, driver=None):
+        self.stop_driver()
+        self.start_driver(driver)
+        self.minimap.set_tiles(self.minimap_tiles)
+
+    def stop_driver(self):
+        self.simulation.stop()
+        self.driver.close()
+        self.minimap_tiles.shutdown()
 
     def on_draw(self):
         """ Render the screen. """
+        profiler = self.driver.profiler
+        if profiler:
+            profiler.start()
+        previous, current, alpha = self.simulation.snapshots()
+        player_x, player_y, player_angle = current.interpolate_player(previous, alpha)
+
+        # the far field lies well outside the window, so draw it, along with
+        # the active chunks, zoomed out around the player as a backdrop
+        zoom = far_field_zoom(self.driver.galaxy, SCREEN_WIDTH, SCREEN_HEIGHT)
+        far_field_left = player_x - SCREEN_WIDTH * zoom / 2
+        far_field_bottom = player_y - SCREEN_HEIGHT * zoom / 2
+        far_field_right = far_field_left + SCREEN_WIDTH * zoom
+        far_field_top = far_field_bottom + SCREEN_HEIGHT * zoom
+        arcade.set_viewport(
+            far_field_left, far_field_right, far_field_bottom, far_field_top
+        )
+        # Clear the screen to the background color
+        arcade.start_render()
+        self.far_field_renderer.update(current.far_field_chunks, current.active_chunks)
+        self.far_field_renderer.draw(
+            far_field_left, far_field_bottom, far_field_right, far_field_top
+        )
+
         # viewport and camera
-        self.view_left = int(self.driver.player.x) - SCREEN_WIDTH // 2
-        self.view_bottom = int(self.driver.player.y) - SCREEN_HEIGHT // 2
+        self.view_left = int(player_x) - SCREEN_WIDTH // 2
+        self.view_bottom = int(player_y) - SCREEN_HEIGHT // 2
         arcade.set_viewport(
             self.view_left,
             SCREEN_WIDTH + self.view_left,
@@ -35,23 +115,20 @@ class GameplayWindow(arcade.Window):
             SCREEN_HEIGHT + self.view_bottom,
         )
 
-        # Clear the screen to the background color
-        arcade.start_render()
+        if current.player_hp > 0:
+            self.driver.player.draw(player_x, player_y, player_angle)
+        self.draw_npcs(previous, current, alpha)
 
-        if not self.driver.player.fainted():
-            self.driver.player.draw()
-
-        for chunk in self.driver.active_chunks:
-            for celestial_body in chunk.celestial_bodies:
-                arcade.draw_circle_filled(
-                    celestial_body.x,
-                    celestial_body.y,
-                    celestial_body.radius,
-                    arcade.color.YELLOW,
-                )
+        self.chunk_renderer.update(current.active_chunks)
+        self.chunk_renderer.draw(
+            self.view_left,
+            self.view_bottom,
+            self.view_left + SCREEN_WIDTH,
+            self.view_bottom + SCREEN_HEIGHT,
+        )
 
         # Draw our score on the screen, scrolling it with the viewport
-        score_text = f"{self.driver.player.x:.2f},{self.driver.player.y:.2f} angle: {self.driver.player.angle:.2f} hp: {self.driver.player.current_hp}"
+        score_text = f"{player_x:.2f},{player_y:.2f} angle: {player_angle:.2f} hp: {current.player_hp}"
         arcade.draw_text(
             score_text,
             self.view_left + 10,
@@ -59,19 +136,95 @@ class GameplayWindow(arcade.Window):
             arcade.csscolor.WHITE,
             18,
         )
+        if self.show_minimap:
+            self.minimap.draw(
+                player_x,
+                player_y,
+                self.minimap_zoom,
+                self.view_left + SCREEN_WIDTH - MARGIN,
+                self.view_bottom + SCREEN_HEIGHT - MARGIN,
+            )
+        if self.show_frame_timings and profiler:
+            self.draw_frame_timings()
+        if profiler:
+            profiler.lap("on_draw")
+
+    def draw_npcs(self, previous, current, alpha):
+        """ Draw the NPCs within the window, interpolated between snapshots """
+        npc_xs, npc_ys, npc_angles = current.interpolate_npcs(previous, alpha)
+        visible = (
+            (npc_xs >= self.view_left - NPC_DRAW_MARGIN)
+            & (npc_xs <= self.view_left + SCREEN_WIDTH + NPC_DRAW_MARGIN)
+            & (npc_ys >= self.view_bottom - NPC_DRAW_MARGIN)
+            & (npc_ys <= self.view_bottom + SCREEN_HEIGHT + NPC_DRAW_MARGIN)
+        )
+        for i in visible.nonzero()[0]:
+            current.npcs[i].draw(npc_xs[i], npc_ys[i], npc_angles[i])
+
+    def draw_frame_timings(self):
+        if self.frames_drawn % FRAME_TIMINGS_OVERLAY_REFRESH == 0:
+            self.frame_timings_text = str(self.driver.profiler)
+        self.frames_drawn += 1
+        arcade.draw_text(
+            self.frame_timings_text,
+            self.view_left + 10,
+            self.view_bottom + SCREEN_HEIGHT - 10,
+            arcade.csscolor.WHITE,
+            14,
+            width=SCREEN_WIDTH,
+            anchor_y="top",
+            font_name="Courier New",
+            multiline=True,
+        )
+
+    def on_close(self):
+        self.stop_driver()
+        super().on_close()
 
     def on_update(self, delta_time):
-        """ Movement and game logic """
-        self.driver.update(delta_time)
+        """ Movement and game logic, at a fixed timestep """
+        if not self.simulation.threaded:
+            self.simulation.advance(delta_time)
 
     def on_key_press(self, key, modifiers):
         """Called whenever a key is pressed. """
         if key == arcade.key.R:
-            self.driver = Driver()
+            self.restart_driver()
+            return
+        if key == arcade.key.F5:
+            with self.simulation.lock:
+                snapshot.save_file(self.driver, SNAPSHOT_PATH)
             return
+        if key == arcade.key.F9 and os.path.exists(SNAPSHOT_PATH):
+            self.restart_driver(snapshot.restore_file(SNAPSHOT_PATH))
+            return
+        if key == arcade.key.M:
+            self.show_minimap = not self.show_minimap
+            return
+        if key == arcade.key.EQUAL:
+            self.minimap_zoom = max(0, self.minimap_zoom - 1)
+            return
+        if key == arcade.key.MINUS:
+            self.minimap_zoom = min(MAX_ZOOM, self.minimap_zoom + 1)
+            return
+        if key == arcade.key.F3:
+            self.show_frame_timings = not self.show_frame_timings
+            with self.simulation.lock:
+                if not self.driver.profiler:
+                    self.driver.profiler = FrameProfiler()
+            return
+        if key == arcade.key.F4:
+            with self.simulation.lock:
+                if self.driver.profiler:
+                    self.driver.profiler.dump(FRAME_TIMINGS_PATH)
+            return
+        with self.simulation.lock:
+            self.handle_player_key_press(key)
+
+    def handle_player_key_press(self, key):
         if not self.driver.player.fainted():
             if key == arcade.key.UP or key == arcade.key.SPACE:
-                self.driver.player.jump()
+                self.driver.do_jump = True
             if key == arcade.key.LEFT:
                 self.driver.moving_left = True
             if key == arcade.key.RIGHT:
@@ -83,7 +236,8 @@ class GameplayWindow(arcade.Window):
 
     def on_key_release(self, key, modifiers):
         """Called when the user releases a key. """
-        if key == arcade.key.LEFT:
-            self.driver.moving_left = False
-        if key == arcade.key.RIGHT:
-            self.driver.moving_right = False
+        with self.simulation.lock:
+            if key == arcade.key.LEFT:
+                self.driver.moving_left = False
+            if key == arcade.key.RIGHT:
+                self.driver.moving_right = False
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+import numpy
+from PIL import Image
+
+from abbot.galaxy.chunk import generate_celestial_body_arrays
+
+TILE_PIXELS = 128
+# Chunks along each side of a tile at zoom level 0, doubling every level
+TILE_CHUNKS = 32
+MAX_ZOOM = 4
+BACKGROUND_COLOR = (0, 0, 0, 160)
+CELESTIAL_BODY_COLOR = (255, 255, 0, 255)
+PLAYER_COLOR = arcade.color.RED
+# Size tiles are drawn at, in pixels
+TILE_DRAW_SIZE = 96
+MARGIN = 10
+
+
+def render_tile(seed, chunk_width, zoom, tile_x, tile_y):
+    """Rasterize the celestial bodies of every chunk within a tile into a
+    TILE_PIXELS square RGBA image, one dot per body.
+    """
+    tile_chunks = TILE_CHUNKS << zoom
+    # bodies may lie up to their offset outside their chunk, so include a
+    # border of chunks and keep whichever bodies land within the tile
+    chunk_offsets = numpy.arange(-1, tile_chunks + 1)
+    chunk_xs, chunk_ys = numpy.meshgrid(
+        tile_x * tile_chunks + chunk_offsets, tile_y * tile_chunks + chunk_offsets
+    )
+    xs, ys, _ = generate_celestial_body_arrays(
+        seed, chunk_xs.ravel(), chunk_ys.ravel(), chunk_width
+    )
+    pixel_width = tile_chunks * chunk_width / TILE_PIXELS
+    columns = numpy.floor((xs - tile_x * tile_chunks * chunk_width) / pixel_width)
+    rows = numpy.floor((ys - tile_y * tile_chunks * chunk_width) / pixel_width)
+    inside = (
+        (columns >= 0) & (columns < TILE_PIXELS) & (rows >= 0) & (rows < TILE_PIXELS)
+    )
+    pixels = numpy.empty((TILE_PIXELS, TILE_PIXELS, 4), numpy.uint8)
+    pixels[:] = BACKGROUND_COLOR
+    # image rows run top down
+    pixels[
+        TILE_PIXELS - 1 - rows[inside].astype(int), columns[inside].astype(int)
+    ] = CELESTIAL_BODY_COLOR
+    return Image.fromarray(pixels, "RGBA")
+
+
+class MinimapTiles:
+    """Minimap tiles of the galaxy, streamed in around the player. Each tile
+    rasterizes TILE_CHUNKS << zoom chunks a side, generated as arrays rather
+    than chunks, on a worker thread. Up to max_tiles rendered tiles are
+    cached, least recently used first out, so zooming and moving back and
+    forth costs nothing.
+    """
+
+    def __init__(self, seed, chunk_width, max_tiles=64, max_workers=1):
+        self.seed = seed
+        self.chunk_width = chunk_width
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="minimap"
+        )
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def tile_width(self, zoom):
+        """ Return the width of a tile at this zoom level, in world units """
+        return (TILE_CHUNKS << zoom) * self.chunk_width
+
+    def tile_coordinates(self, x, y, zoom):
+        tile_width = self.tile_width(zoom)
+        return int(x // tile_width), int(y // tile_width)
+
+    def visible_tile_coordinates(self, x, y, zoom):
+        """ Return (zoom, tile_x, tile_y) of the 3x3 tiles around x,y """
+        tile_x, tile_y = self.tile_coordinates(x, y, zoom)
+        return [
+            (zoom, tile_x + offset_x, tile_y + offset_y)
+            for offset_y in (1, 0, -1)
+            for offset_x in (-1, 0, 1)
+        ]
+
+    def update(self, x, y, zoom):
+        """Cache tiles that finished rendering, and schedule rendering of the
+        visible tiles around x,y that are neither cached nor pending.
+        """
+        visible = self.visible_tile_coordinates(x, y, zoom)
+        for tile, future in list(self._pending.items()):
+            if future.done():
+                del self._pending[tile]
+                if not future.cancelled():
+                    self._tiles[tile] = future.result()
+            elif tile not in visible and future.cancel():
+                del self._pending[tile]
+        for tile in visible:
+            if tile in self._tiles:
+                self._tiles.move_to_end(tile)
+                continue
+            if tile in self._pending:
+                continue
+            self._pending[tile] = self._executor.submit(
+                render_tile, self.seed, self.chunk_width, *tile
+            )
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def tile(self, zoom, tile_x, tile_y):
+        """ Return the rendered tile image, or None if it is not ready yet """
+        return self._tiles.get((zoom, tile_x, tile_y))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MinimapOverlay:
+    """Draws the 3x3 minimap tiles around the player in a corner of the
+    screen. Tiles are shown through nine slot textures whose images are
+    replaced in place in the texture atlas as the player moves, so drawing
+    is one sprite list draw and the atlas never grows.
+    """
+
+    def __init__(self, tiles, tile_draw_size=TILE_DRAW_SIZE):
+        self.tiles = tiles
+        self.tile_draw_size = tile_draw_size
+        self._blank_image = Image.new("RGBA", (TILE_PIXELS, TILE_PIXELS))
+        self._sprite_list = None
+        self._slot_tiles = [None] * 9
+
+    def set_tiles(self, tiles):
+        """Show tiles instead, e.g. of a restarted galaxy. Every slot is
+        redrawn, even where the tile coordinates stay the same.
+        """
+        self.tiles = tiles
+        self._slot_tiles = [None] * 9
+
+    def create_sprite_list(self):
+        self._sprite_list = arcade.SpriteList()
+        for slot in range(9):
+            texture = arcade.Texture(
+                f"minimap-slot-{slot}", self._blank_image, hit_box_algorithm="None"
+            )
+            sprite = arcade.Sprite()
+            sprite.texture = texture
+            sprite.width = sprite.height = self.tile_draw_size
+            self._sprite_list.append(sprite)
+
+    def draw(self, x, y, zoom, right, top):
+        """Draw the tiles around x,y at this zoom level, with the top right
+        corner of the overlay at right, top in screen coordinates.
+        """
+        if self._sprite_list is None:
+            self.create_sprite_list()
+        self.tiles.update(x, y, zoom)
+        visible = self.tiles.visible_tile_coordinates(x, y, zoom)
+        left = right - 3 * self.tile_draw_size
+        for slot, (tile, sprite) in enumerate(zip(visible, self._sprite_list)):
+            # slots hold (tile, whether its image is ready yet)
+            slot_tile = self._slot_tiles[slot]
+            if slot_tile != (tile, True):
+                image = self.tiles.tile(*tile)
+                if image is not None or slot_tile is None or slot_tile[0] != tile:
+                    sprite.texture.image = self._blank_image if image is None else image
+                    self._sprite_list.atlas.update_texture_image(sprite.texture)
+                    self._slot_tiles[slot] = (tile, image is not None)
+            sprite.left = left + (slot % 3) * self.tile_draw_size
+            sprite.top = top - (slot // 3) * self.tile_draw_size
+        self._sprite_list.draw()
+
+        # player marker, relative to the bottom left visible tile
+        _, tile_x, tile_y = visible[6]
+        tile_width = self.tiles.tile_width(zoom)
+        arcade.draw_point(
+            left + (x / tile_width - tile_x) * self.tile_draw_size,
+            top
+            - 3 * self.tile_draw_size
+            + (y / tile_width - tile_y) * self.tile_draw_size,
+            PLAYER_COLOR,
+            4,
+        )
@@ -0,0 +1,91 @@
+"""Benchmarks for the galaxy and simulation hot paths. Save a baseline on
+one commit and compare against it on another, e.g.
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks --compare baseline.json --threshold 0.1
+
+Each benchmark is a setup function registered with @benchmark, returning
+the operation to time, or the operation and a teardown run after timing
+it. Operations are timed repeat times, each after a fresh setup, and the
+fastest run is what gets compared.
+
+benchmarks/baseline.json is a baseline of the current tree, to compare
+against when no baseline of your own was saved.
+"""
+import contextlib
+import gc
+import json
+import os
+import statistics
+import time
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=5):
+    """ Register a setup function returning the operation to time """
+
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+
+    return decorator
+
+
+def run_benchmark(setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        operation = setup()
+        teardown = None
+        if isinstance(operation, tuple):
+            operation, teardown = operation
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+        if teardown:
+            teardown()
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def run_benchmarks(pattern=None):
+    """Run registered benchmarks whose name contains pattern. Anything the
+    code under test prints is discarded.
+    """
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, (setup, repeat) in BENCHMARKS.items():
+            if pattern and pattern not in name:
+                continue
+            results[name] = run_benchmark(setup, repeat)
+        gc.collect()
+    return results
+
+
+def compare(baseline, results):
+    """Return (name, baseline seconds, current seconds, ratio) for each
+    benchmark present in both, where a ratio above 1 means slower.
+    """
+    comparison = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["min"]
+        after = result["min"]
+        comparison.append((name, before, after, after / before if before else 1))
+    return comparison
+
+
+def regressions(comparison, threshold):
+    """ Return the compared benchmarks that slowed down beyond threshold """
+    return [entry for entry in comparison if entry[3] > 1 + threshold]
+
+
+def load_results(path):
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def save_results(path, results):
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
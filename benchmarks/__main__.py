@@ -0,0 +1,54 @@
+import argparse
+import sys
+
+from benchmarks import (
+    compare,
+    load_results,
+    regressions,
+    run_benchmarks,
+    save_results,
+)
+import benchmarks.galaxy
+import benchmarks.replay
+import benchmarks.simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--filter", help="only run benchmarks containing this")
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--compare", help="compare against this baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fail when slower than the baseline by more than this fraction",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter)
+    if args.save:
+        save_results(args.save, results)
+    if not args.compare:
+        for name, result in results.items():
+            print(
+                f"{name:48} min {result['min'] * 1000:10.3f}ms "
+                f"median {result['median'] * 1000:10.3f}ms"
+            )
+        return
+
+    comparison = compare(load_results(args.compare), results)
+    for name, before, after, ratio in comparison:
+        print(
+            f"{name:48} {before * 1000:10.3f}ms -> {after * 1000:10.3f}ms "
+            f"{(ratio - 1) * 100:+7.1f}%"
+        )
+    slower = regressions(comparison, args.threshold)
+    if slower:
+        names = ", ".join(entry[0] for entry in slower)
+        print(f"Regressed beyond {args.threshold * 100:.0f}%: {names}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
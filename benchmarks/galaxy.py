@@ -0,0 +1,86 @@
+import random
+
+from abbot.galaxy import Chunk, Galaxy
+from benchmarks import benchmark
+
+SEED = 1
+CHUNK_WIDTH = 2 ** 14
+
+
+def straight_path(steps=400):
+    return [(step * CHUNK_WIDTH / 20, 0) for step in range(steps)]
+
+
+def diagonal_path(steps=400):
+    return [(step * CHUNK_WIDTH / 20, step * CHUNK_WIDTH / 20) for step in range(steps)]
+
+
+def jitter_path(steps=400):
+    """ Back and forth across a chunk corner, the worst case for small caches """
+    offsets = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    return [
+        (CHUNK_WIDTH + offsets[step % 4][0], CHUNK_WIDTH + offsets[step % 4][1])
+        for step in range(steps)
+    ]
+
+
+def random_walk_path(steps=400):
+    rng = random.Random(SEED)
+    x = y = 0
+    path = []
+    for _ in range(steps):
+        x += rng.uniform(-1, 1) * CHUNK_WIDTH / 4
+        y += rng.uniform(-1, 1) * CHUNK_WIDTH / 4
+        path.append((x, y))
+    return path
+
+
+TRAVERSAL_PATHS = {
+    "straight": straight_path,
+    "diagonal": diagonal_path,
+    "jitter": jitter_path,
+    "random_walk": random_walk_path,
+}
+
+
+@benchmark("chunk_construction")
+def chunk_construction():
+    def operation():
+        for chunk_x in range(200):
+            Chunk(SEED, chunk_x, 0, CHUNK_WIDTH)
+
+    return operation
+
+
+def traversal_benchmark(path):
+    def setup():
+        galaxy = Galaxy(SEED, CHUNK_WIDTH)
+        positions = path()
+
+        def operation():
+            for x, y in positions:
+                galaxy.update_active_chunks(x, y)
+
+        return operation
+
+    return setup
+
+
+for path_name, path in TRAVERSAL_PATHS.items():
+    benchmark(f"galaxy_traversal[{path_name}]")(traversal_benchmark(path))
+
+
+@benchmark("closest_celestial_body")
+def closest_celestial_body():
+    galaxy = Galaxy(SEED, CHUNK_WIDTH)
+    galaxy.update_active_chunks(CHUNK_WIDTH / 2, CHUNK_WIDTH / 2)
+    rng = random.Random(SEED)
+    positions = [
+        (rng.uniform(0, CHUNK_WIDTH), rng.uniform(0, CHUNK_WIDTH)) for _ in range(10000)
+    ]
+
+    def operation():
+        for x, y in positions:
+            galaxy.closest_celestial_body(x, y)
+
+    return operation
@@ -0,0 +1,31 @@
+"""Replay logs captured from real sessions, e.g. with
+REPLAY_DIRECTORY=benchmarks/replays, are benchmarks too: every *.rpl file
+in benchmarks/replays is replayed through a headless Driver as
+replay[<file name>].
+"""
+import glob
+import os
+
+from abbot.driver import Driver
+from abbot.replay import ReplayLog, replay
+from benchmarks import benchmark
+
+REPLAY_DIRECTORY = os.path.join(os.path.dirname(__file__), "replays")
+
+
+def replay_benchmark(path):
+    def setup():
+        log = ReplayLog.from_file(path)
+        driver = Driver(log.seed, prefetch=False)
+
+        def operation():
+            replay(driver, log, check=False)
+
+        return operation, driver.close
+
+    return setup
+
+
+for path in sorted(glob.glob(os.path.join(REPLAY_DIRECTORY, "*.rpl"))):
+    name = os.path.splitext(os.path.basename(path))[0]
+    benchmark(f"replay[{name}]", repeat=3)(replay_benchmark(path))
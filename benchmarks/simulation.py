@@ -0,0 +1,140 @@
+import math
+
+from abbot.driver import Driver
+from abbot.galaxy import Galaxy
+from abbot.gravity import GravityField
+from abbot.npc import NPC, NPCPopulation
+from benchmarks import benchmark
+
+SEED = 1
+NPC_COUNTS = [1, 10, 100]
+POPULATION_COUNTS = [1000, 10000]
+POPULATION_TICKS = 10
+TICKS = 60
+TIMESTEP = 1 / 60
+
+
+def spawn_npcs(count, radius=1500):
+    npcs = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        npcs.append(
+            NPC("kingkrool", x=radius * math.cos(angle), y=radius * math.sin(angle))
+        )
+    return npcs
+
+
+@benchmark("driver_update_active_chunks[boundary_crossing]")
+def driver_update_active_chunks():
+    driver = Driver(SEED, prefetch=False)
+    chunk_width = driver.galaxy.chunk_width
+
+    def operation():
+        for step in range(100):
+            x = chunk_width * (step % 2) + (1 if step % 2 else -1)
+            driver.player.body.position = x, 0
+            driver.update_active_chunks()
+
+    return operation, driver.close
+
+
+def npc_update_benchmark(count):
+    def setup():
+        driver = Driver(SEED, prefetch=False)
+        npcs = spawn_npcs(count)
+        closest_celestial_body = driver.galaxy.closest_celestial_body(0, 0)
+        driver.close()
+
+        def operation():
+            for _ in range(TICKS):
+                for npc in npcs:
+                    npc.update(closest_celestial_body)
+
+        return operation
+
+    return setup
+
+
+def driver_update_benchmark(count):
+    def setup():
+        driver = Driver(SEED, prefetch=False)
+        driver.add_npcs(spawn_npcs(count))
+
+        def operation():
+            for _ in range(TICKS):
+                driver.update(TIMESTEP)
+
+        return operation, driver.close
+
+    return setup
+
+
+for npc_count in NPC_COUNTS:
+    benchmark(f"npc_update[{npc_count}]")(npc_update_benchmark(npc_count))
+    benchmark(f"driver_update[{npc_count}]")(driver_update_benchmark(npc_count))
+
+
+def population_galaxy():
+    galaxy = Galaxy(SEED)
+    galaxy.update_active_chunks(0, 0)
+    return galaxy
+
+
+def npc_per_instance_update_benchmark(count):
+    def setup():
+        galaxy = population_galaxy()
+        npcs = spawn_npcs(count)
+
+        def operation():
+            for _ in range(POPULATION_TICKS):
+                for npc in npcs:
+                    npc.update(galaxy.closest_celestial_body(npc.x, npc.y))
+
+        return operation
+
+    return setup
+
+
+def npc_population_update_benchmark(count):
+    def setup():
+        galaxy = population_galaxy()
+        population = NPCPopulation(spawn_npcs(count))
+
+        def operation():
+            for _ in range(POPULATION_TICKS):
+                population.update(galaxy)
+
+        return operation
+
+    return setup
+
+
+for npc_count in POPULATION_COUNTS:
+    benchmark(f"npc_per_instance_update[{npc_count}]", repeat=3)(
+        npc_per_instance_update_benchmark(npc_count)
+    )
+    benchmark(f"npc_population_update[{npc_count}]", repeat=3)(
+        npc_population_update_benchmark(npc_count)
+    )
+
+
+def npc_population_gravity_field_update_benchmark(count):
+    def setup():
+        galaxy = population_galaxy()
+        gravity_field = GravityField()
+        gravity_field.rebuild(*galaxy.celestial_body_arrays())
+        population = NPCPopulation(spawn_npcs(count))
+
+        def operation():
+            for _ in range(POPULATION_TICKS):
+                population.update(galaxy, gravity_field, TIMESTEP)
+
+        return operation
+
+    return setup
+
+
+for npc_count in POPULATION_COUNTS:
+    benchmark(f"npc_population_gravity_field_update[{npc_count}]", repeat=3)(
+        npc_population_gravity_field_update_benchmark(npc_count)
+    )
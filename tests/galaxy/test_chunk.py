@@ -1,8 +1,11 @@
+import subprocess
+import sys
 import unittest
 
 import pytest
 
 from abbot.galaxy import Chunk
+from abbot.galaxy.rng import chunk_key
 
 
 def test_chunk_seed_create_is_equivalent():
@@ -10,3 +13,37 @@ def test_chunk_seed_create_is_equivalent():
     chunk_2 = Chunk(seed=0, chunk_x=0, chunk_y=1, chunk_width=2 ** 10)
     assert len(chunk_1.celestial_bodies) == len(chunk_2.celestial_bodies)
     assert chunk_1.celestial_bodies[0] == chunk_2.celestial_bodies[0]
+
+
+def test_chunk_seed_is_the_chunk_key():
+    chunk = Chunk(seed=3, chunk_x=-2, chunk_y=5, chunk_width=2 ** 10)
+    assert chunk.chunk_seed == chunk_key(3, -2, 5)
+
+
+def test_chunk_celestial_body_arrays():
+    chunk = Chunk(seed=0, chunk_x=2, chunk_y=-1, chunk_width=2 ** 10)
+    assert len(chunk.xs) == len(chunk.ys) == len(chunk.radii)
+    for i, celestial_body in enumerate(chunk.celestial_bodies):
+        assert chunk.xs[i] == celestial_body.x
+        assert chunk.ys[i] == celestial_body.y
+        assert chunk.radii[i] == celestial_body.radius
+
+
+def test_celestial_bodies_are_plain_records():
+    celestial_body = Chunk(
+        seed=0, chunk_x=0, chunk_y=0, chunk_width=2 ** 10
+    ).celestial_bodies[0]
+    with pytest.raises(AttributeError):
+        celestial_body.shape = None
+
+
+def test_galaxy_does_not_depend_on_physics(tmp_path):
+    code = (
+        "import sys\n"
+        "from abbot.galaxy import Galaxy\n"
+        f"galaxy = Galaxy(seed=1, store_directory={str(tmp_path)!r})\n"
+        "galaxy.update_active_chunks(0, 0)\n"
+        "galaxy.close()\n"
+        "assert 'pymunk' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,52 @@
+import unittest
+
+import pytest
+
+from abbot.galaxy import Chunk, ChunkCache
+from abbot.galaxy.chunk_cache import estimate_chunk_bytes
+
+
+def load(chunk_x, chunk_y):
+    return Chunk(seed=0, chunk_x=chunk_x, chunk_y=chunk_y, chunk_width=2 ** 10)
+
+
+def test_chunk_cache_hits_and_misses():
+    cache = ChunkCache(load)
+    chunk = cache.get(0, 0)
+    assert cache.get(0, 0) is chunk
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.generation_time > 0
+
+
+def test_chunk_cache_evicts_least_recently_used():
+    cache = ChunkCache(load, max_chunks=2)
+    cache.get(0, 0)
+    cache.get(1, 0)
+    cache.get(0, 0)
+    cache.get(2, 0)
+    assert (0, 0) in cache
+    assert (1, 0) not in cache
+    assert (2, 0) in cache
+    assert cache.stats.evictions == 1
+
+
+def test_chunk_cache_never_evicts_pinned():
+    cache = ChunkCache(load, max_chunks=0)
+    cache.pin([(0, 0), (1, 0)])
+    chunk = cache.get(0, 0)
+    cache.get(1, 0)
+    cache.get(2, 0)
+    assert len(cache) == 2
+    assert cache.get(0, 0) is chunk
+    cache.pin([])
+    assert len(cache) == 0
+
+
+def test_chunk_cache_evicts_by_bytes():
+    chunk_bytes = estimate_chunk_bytes(load(0, 0))
+    cache = ChunkCache(load, max_chunks=100, max_bytes=2 * chunk_bytes)
+    for chunk_x in range(4):
+        cache.get(chunk_x, 0)
+    assert len(cache) == 2
+    assert (3, 0) in cache
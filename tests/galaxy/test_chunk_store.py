@@ -0,0 +1,72 @@
+import unittest
+
+import pytest
+
+from abbot.galaxy import Chunk, ChunkStore, Galaxy
+from abbot.galaxy.chunk_store import REGION_SIZE
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ChunkStore(tmp_path, seed=3, chunk_width=2 ** 14)
+    yield store
+    store.close()
+
+
+def chunk(chunk_x, chunk_y):
+    return Chunk(3, chunk_x, chunk_y, 2 ** 14)
+
+
+def test_store_round_trip(store):
+    chunks = [chunk(0, 0), chunk(-1, 5), chunk(REGION_SIZE, -REGION_SIZE)]
+    store.write(chunks)
+    for written in chunks:
+        assert store.contains(written.chunk_x, written.chunk_y)
+        xs, ys, radii = store.read(written.chunk_x, written.chunk_y)
+        assert list(xs) == list(written.xs)
+        assert list(ys) == list(written.ys)
+        assert list(radii) == list(written.radii)
+    assert not store.contains(1, 0)
+    assert store.read(1, 0) is None
+    assert store.read(10 * REGION_SIZE, 0) is None
+
+
+def test_store_rewrite_and_reopen(store, tmp_path):
+    store.write([chunk(0, 0)])
+    assert store.contains(0, 0)
+    store.write([chunk(1, 0), chunk(0, 0)])
+    store.close()
+    reopened = ChunkStore(tmp_path, seed=3, chunk_width=2 ** 14)
+    assert reopened.contains(0, 0) and reopened.contains(1, 0)
+    reopened.close()
+
+
+def test_store_rejects_other_seed(store, tmp_path):
+    store.write([chunk(0, 0)])
+    with pytest.raises(ValueError):
+        ChunkStore(tmp_path, seed=4, chunk_width=2 ** 14).read(0, 0)
+
+
+@pytest.mark.parametrize("seed", [-5, 2 ** 63 + 1, 2 ** 64 - 1])
+def test_store_accepts_any_64_bit_seed(tmp_path, seed):
+    store = ChunkStore(tmp_path, seed=seed, chunk_width=2 ** 14)
+    store.write([Chunk(seed, 0, 0, 2 ** 14)])
+    store.close()
+    reopened = ChunkStore(tmp_path, seed=seed, chunk_width=2 ** 14)
+    assert reopened.contains(0, 0)
+    reopened.close()
+
+
+def test_galaxy_writes_dirty_chunks_in_batches(tmp_path):
+    galaxy = Galaxy(seed=3, store_directory=tmp_path, store_batch_size=10)
+    galaxy.update_active_chunks(0, 0)
+    assert not galaxy.store.contains(0, 0)
+    galaxy.chunk_from_chunk_coordinates(5, 5)
+    assert galaxy.store.contains(0, 0)
+    galaxy.close()
+
+    reloaded = Galaxy(seed=3, store_directory=tmp_path)
+    loaded = reloaded.chunk_from_chunk_coordinates(5, 5)
+    assert not loaded.dirty
+    assert loaded.celestial_bodies == chunk(5, 5).celestial_bodies
+    reloaded.close()
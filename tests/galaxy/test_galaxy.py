@@ -1,5 +1,7 @@
+import math
 import unittest
 
+import numpy
 import pytest
 
 from abbot.galaxy import Chunk, Galaxy
@@ -37,3 +39,105 @@ def test_position_to_active_chunk_coordinates(galaxy):
 def test_position_to_active_chunks(galaxy):
     chunks = list(galaxy.position_to_active_chunks(0, 0))
     assert len(chunks) == 9
+
+
+def test_update_active_chunks_only_on_chunk_change(galaxy):
+    active_chunks = galaxy.update_active_chunks(0, 0)
+    assert len(active_chunks) == 9
+    assert galaxy.update_active_chunks(1, 1) is active_chunks
+    assert galaxy.update_active_chunks(galaxy.chunk_width, 0) is not active_chunks
+
+
+def test_closest_celestial_body(galaxy):
+    assert galaxy.closest_celestial_body(0, 0) is None
+    galaxy.update_active_chunks(0, 0)
+    closest = galaxy.closest_celestial_body(0, 0)
+    assert closest in galaxy.chunk_from_chunk_coordinates(0, 0).celestial_bodies
+    assert galaxy.k_closest_celestial_bodies(0, 0, 2)[0] is closest
+
+
+def test_closest_celestial_bodies(galaxy):
+    active_chunks = galaxy.update_active_chunks(0, 0)
+    points = [(0, 0), (galaxy.chunk_width, galaxy.chunk_width), (-5000, 3000)]
+    closest = galaxy.closest_celestial_bodies(*zip(*points))
+    for (x, y), celestial_body in zip(points, closest):
+        assert celestial_body is galaxy.closest_celestial_body(x, y)
+    # queries never move the active chunks
+    galaxy.closest_celestial_body(10 * galaxy.chunk_width, 0)
+    assert galaxy.active_chunks is active_chunks
+
+
+def test_celestial_bodies_within(galaxy):
+    galaxy.update_active_chunks(0, 0)
+    assert galaxy.closest_celestial_body(0, 0) in galaxy.celestial_bodies_within(
+        0, 0, 0
+    )
+    assert len(galaxy.celestial_bodies_within(0, 0, 10 * galaxy.chunk_width)) == 9
+
+
+def test_celestial_bodies_in_rect(galaxy):
+    galaxy.update_active_chunks(0, 0)
+    celestial_bodies = galaxy.celestial_bodies_in_rect(-640, -512, 640, 512)
+    assert galaxy.closest_celestial_body(0, 0) in celestial_bodies
+    assert len(celestial_bodies) == 1
+
+
+def test_active_chunks_are_pinned(galaxy):
+    galaxy.update_active_chunks(0, 0)
+    assert galaxy.chunk_cache.is_pinned(1, 1)
+    galaxy.update_active_chunks(10 * galaxy.chunk_width, 0)
+    assert not galaxy.chunk_cache.is_pinned(1, 1)
+    assert galaxy.has_chunk(1, 1)
+
+
+def test_physics_radius_widens_active_chunks():
+    galaxy = Galaxy(seed=1, physics_radius=2, far_field_radius=2)
+    assert len(galaxy.update_active_chunks(0, 0)) == 25
+    assert galaxy.far_field_chunks == []
+
+
+def test_far_field_chunks_surround_active_chunks(galaxy):
+    galaxy.update_active_chunks(0, 0)
+    far_field_chunks = galaxy.far_field_chunks
+    assert len(far_field_chunks) == 7 * 7 - 9
+    for far_field_chunk in far_field_chunks:
+        assert not hasattr(far_field_chunk, "celestial_bodies")
+        chunk = Chunk(
+            galaxy.seed,
+            far_field_chunk.chunk_x,
+            far_field_chunk.chunk_y,
+            galaxy.chunk_width,
+        )
+        assert list(far_field_chunk.xs) == list(chunk.xs)
+        assert list(far_field_chunk.radii) == list(chunk.radii)
+
+    galaxy.update_active_chunks(galaxy.chunk_width, 0)
+    by_coordinates = {(c.chunk_x, c.chunk_y): c for c in galaxy.far_field_chunks}
+    assert (1, 0) not in by_coordinates
+    assert (0, 0) not in by_coordinates
+    assert by_coordinates[(3, 3)] in far_field_chunks
+
+
+def test_far_field_chunks_leave_the_chunk_cache_alone(galaxy):
+    modified = galaxy.chunk_from_arrays(
+        3, 0, numpy.array([3.0 * galaxy.chunk_width]), numpy.zeros(1), numpy.ones(1)
+    )
+    galaxy.mark_modified(modified)
+    galaxy.update_active_chunks(0, 0)
+    assert (3, 0) not in galaxy.chunk_cache
+    assert (-3, 0) not in galaxy.chunk_cache
+    assert galaxy.chunk_cache.stats.misses == 9
+    by_coordinates = {(c.chunk_x, c.chunk_y): c for c in galaxy.far_field_chunks}
+    assert list(by_coordinates[(3, 0)].radii) == [1]
+
+
+def test_closest_far_field_celestial_body(galaxy):
+    galaxy.update_active_chunks(0, 0)
+    far_field_celestial_bodies = [
+        (x, y, radius)
+        for chunk in galaxy.far_field_chunks
+        for x, y, radius in zip(chunk.xs, chunk.ys, chunk.radii)
+    ]
+    assert galaxy.closest_far_field_celestial_body(0, 0) == min(
+        far_field_celestial_bodies, key=lambda body: math.hypot(*body[:2]) - body[2]
+    )
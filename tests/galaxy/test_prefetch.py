@@ -0,0 +1,62 @@
+import unittest
+
+import pytest
+
+from abbot.galaxy import ChunkPrefetcher, Galaxy
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = ChunkPrefetcher(
+        Galaxy(seed=1), integration_budget=2, integration_delay=2
+    )
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def test_predicted_chunk_coordinates(prefetcher):
+    width = prefetcher.galaxy.chunk_width
+    chunk_coordinates = prefetcher.predicted_chunk_coordinates(0, 0, width, 0)
+    assert len(chunk_coordinates) == 25
+    assert (3, 0) in chunk_coordinates
+    assert (-2, 0) not in chunk_coordinates
+
+
+def test_schedule_skips_active_chunks(prefetcher):
+    prefetcher.schedule(0, 0, 0, 0)
+    assert prefetcher.wants(2, 2)
+    assert (0, 0) not in prefetcher._scheduled
+    assert (2, 2) in prefetcher._scheduled
+
+
+def test_prefetched_chunk_is_used_by_galaxy(prefetcher):
+    width = prefetcher.galaxy.chunk_width
+    prefetcher.schedule(0, 0, width, 0)
+    future, _ = prefetcher._scheduled[(3, 0)]
+    assert prefetcher.galaxy.chunk_from_chunk_coordinates(3, 0) is future.result()
+
+
+def test_finished_chunks_respects_budget(prefetcher):
+    width = prefetcher.galaxy.chunk_width
+    prefetcher.schedule(0, 0, width, 0)
+    assert prefetcher.finished_chunks() == []
+    prefetcher.schedule(0, 0, width, 0)
+    assert prefetcher.finished_chunks() == []
+    prefetcher.schedule(0, 0, width, 0)
+    # of the scheduled chunks only those next to the window become active,
+    # and are handed out whether or not the workers have finished them yet
+    assert len(prefetcher.finished_chunks()) == 2
+    assert len(prefetcher.finished_chunks()) == 1
+    assert prefetcher.finished_chunks() == []
+    assert (3, 0) in prefetcher._scheduled
+    assert (2, 0) not in prefetcher._scheduled
+    assert prefetcher.galaxy.has_chunk(2, 0)
+
+
+def test_schedule_drops_chunks_that_became_active(prefetcher):
+    width = prefetcher.galaxy.chunk_width
+    prefetcher.schedule(0, 0, width, 0)
+    assert (2, 0) in prefetcher._scheduled
+    prefetcher.schedule(width, 0, 0, 0)
+    assert (2, 0) not in prefetcher._scheduled
+    assert prefetcher.galaxy.chunk_from_chunk_coordinates(2, 0).chunk_x == 2
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy
+import pytest
+
+from abbot.galaxy.chunk import Chunk
+from abbot.galaxy.chunk_store import ChunkStore
+from abbot.galaxy.pregen import parse_region, pregenerate
+
+SEED = 7
+CHUNK_WIDTH = 2 ** 14
+
+
+def test_parse_region():
+    assert parse_region("3,-2,-1,4") == (-1, -2, 3, 4)
+
+
+def test_pregenerate_matches_generation_and_resumes(tmp_path):
+    region = (-3, -2, 2, 1)
+    generated = pregenerate(
+        SEED, region, tmp_path, chunk_width=CHUNK_WIDTH, workers=2, batch_size=5
+    )
+    assert generated == 24
+
+    store = ChunkStore(tmp_path, SEED, CHUNK_WIDTH)
+    for chunk_x in range(-3, 3):
+        for chunk_y in range(-2, 2):
+            xs, ys, radii = store.read(chunk_x, chunk_y)
+            chunk = Chunk(SEED, chunk_x, chunk_y, CHUNK_WIDTH)
+            numpy.testing.assert_array_equal(xs, chunk.xs)
+            numpy.testing.assert_array_equal(ys, chunk.ys)
+            numpy.testing.assert_array_equal(radii, chunk.radii)
+    store.close()
+
+    assert pregenerate(SEED, region, tmp_path, chunk_width=CHUNK_WIDTH) == 0
+    assert pregenerate(SEED, (-3, -2, 3, 1), tmp_path, chunk_width=CHUNK_WIDTH) == 4
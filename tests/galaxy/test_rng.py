@@ -0,0 +1,101 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from abbot.galaxy import Chunk
+from abbot.galaxy import chunk as chunk_module
+from abbot.galaxy.chunk import generate_celestial_body_arrays
+from abbot.galaxy.rng import (
+    ChunkRandom,
+    chunk_key,
+    chunk_keys,
+    draw_u64s,
+    seed_from_u64,
+    seed_to_u64,
+)
+
+CHUNK_COORDINATES = [(x, y) for x in range(-4, 4) for y in range(-4, 4)]
+
+
+def chunk_bytes(chunk):
+    return chunk.xs.tobytes() + chunk.ys.tobytes() + chunk.radii.tobytes()
+
+
+def generate(chunk_coordinates):
+    chunk_x, chunk_y = chunk_coordinates
+    return chunk_bytes(Chunk(7, chunk_x, chunk_y, 2 ** 14))
+
+
+def test_chunk_random_known_values():
+    # pinned so generation stays identical across versions and processes
+    chunk_random = ChunkRandom(42, -3, 7)
+    assert [chunk_random.next_u64() for _ in range(3)] == [
+        13318409260457161942,
+        15153751153785088467,
+        326957880838973163,
+    ]
+
+
+def test_chunk_random_ranges():
+    chunk_random = ChunkRandom(0, 0, 0)
+    for _ in range(1000):
+        assert 0 <= chunk_random.random() < 1
+        assert -2 <= chunk_random.randint(-2, 2) <= 2
+
+
+def test_chunk_keys_differ():
+    keys = {chunk_key(seed, x, y) for seed in range(4) for x, y in CHUNK_COORDINATES}
+    assert len(keys) == 4 * len(CHUNK_COORDINATES)
+    assert chunk_key(0, 0, 0, stream=0) != chunk_key(0, 0, 0, stream=1)
+
+
+def test_generation_is_independent_of_order_and_threads():
+    expected = [generate(c) for c in CHUNK_COORDINATES]
+    shuffled = list(CHUNK_COORDINATES)
+    random.Random(0).shuffle(shuffled)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        generated = dict(zip(shuffled, executor.map(generate, shuffled)))
+    assert [generated[c] for c in CHUNK_COORDINATES] == expected
+
+
+def test_generation_is_independent_of_global_random():
+    expected = generate((1, 2))
+    random.seed(123)
+    random.random()
+    assert generate((1, 2)) == expected
+
+
+def test_vectorized_draws_match_chunk_random():
+    chunk_xs, chunk_ys = zip(*CHUNK_COORDINATES)
+    keys = chunk_keys(2 ** 40 + 3, chunk_xs, chunk_ys)
+    for counter in range(1, 4):
+        draws = draw_u64s(keys, counter)
+        for i, (chunk_x, chunk_y) in enumerate(CHUNK_COORDINATES):
+            chunk_random = ChunkRandom(2 ** 40 + 3, chunk_x, chunk_y)
+            chunk_random.counter = counter - 1
+            assert int(draws[i]) == chunk_random.next_u64()
+
+
+@pytest.mark.parametrize("bodies_per_chunk", [1, 3])
+def test_vectorized_generation_matches_chunks(monkeypatch, bodies_per_chunk):
+    monkeypatch.setattr(chunk_module, "CELESTIAL_BODIES_PER_CHUNK", bodies_per_chunk)
+    chunk_xs, chunk_ys = zip(*CHUNK_COORDINATES)
+    xs, ys, radii = generate_celestial_body_arrays(7, chunk_xs, chunk_ys, 2 ** 14)
+    assert len(xs) == len(ys) == len(radii) == bodies_per_chunk * len(chunk_xs)
+    for i, (chunk_x, chunk_y) in enumerate(CHUNK_COORDINATES):
+        chunk = Chunk(7, chunk_x, chunk_y, 2 ** 14)
+        assert len(chunk.celestial_bodies) == bodies_per_chunk
+        bodies = slice(i * bodies_per_chunk, (i + 1) * bodies_per_chunk)
+        assert xs[bodies].tolist() == chunk.xs.tolist()
+        assert ys[bodies].tolist() == chunk.ys.tolist()
+        assert radii[bodies].tolist() == chunk.radii.tolist()
+
+
+def test_stored_seeds_generate_the_same_galaxy():
+    for seed in (0, 5, -5, 2 ** 63, 2 ** 64 - 1):
+        stored = seed_to_u64(seed)
+        assert 0 <= stored < 2 ** 64
+        assert chunk_key(seed_from_u64(stored), 1, 2) == chunk_key(seed, 1, 2)
+    assert seed_from_u64(seed_to_u64(-5)) == -5
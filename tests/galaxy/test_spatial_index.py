@@ -0,0 +1,74 @@
+import random
+import unittest
+
+import pytest
+
+from abbot.galaxy import Chunk
+from abbot.galaxy.spatial_index import CelestialBodyIndex
+from abbot.math import distance
+
+
+def surface_distance(celestial_body, x, y):
+    return distance(celestial_body.x, celestial_body.y, x, y) - celestial_body.radius
+
+
+@pytest.fixture
+def chunks():
+    return [
+        Chunk(seed=0, chunk_x=chunk_x, chunk_y=chunk_y, chunk_width=2 ** 14)
+        for chunk_x in range(-2, 3)
+        for chunk_y in range(-2, 3)
+    ]
+
+
+@pytest.fixture
+def index(chunks):
+    index = CelestialBodyIndex()
+    for chunk in chunks:
+        index.add_chunk(chunk)
+    return index
+
+
+def test_closest_matches_linear_scan(chunks, index):
+    celestial_bodies = [body for chunk in chunks for body in chunk.celestial_bodies]
+    for x, y in [(0, 0), (20000, -5000), (-40000, 40000), (10 ** 6, 0)]:
+        expected = min(celestial_bodies, key=lambda b: surface_distance(b, x, y))
+        assert index.closest(x, y) is expected
+
+
+def test_k_closest_is_ordered(chunks, index):
+    celestial_bodies = [body for chunk in chunks for body in chunk.celestial_bodies]
+    expected = sorted(celestial_bodies, key=lambda b: surface_distance(b, 100, 100))
+    assert index.k_closest(100, 100, 4) == expected[:4]
+    assert len(index.k_closest(100, 100, 1000)) == len(celestial_bodies)
+
+
+def test_remove_chunk(chunks, index):
+    closest = index.closest(0, 0)
+    chunk = next(chunk for chunk in chunks if closest in chunk.celestial_bodies)
+    index.remove_chunk(chunk)
+    assert chunk not in index
+    assert index.closest(0, 0) is not closest
+    for chunk in chunks:
+        index.remove_chunk(chunk)
+    assert index.closest(0, 0) is None
+
+
+def test_closest_many_matches_closest(index):
+    rng = random.Random(1)
+    points = [(0, 0), (10 ** 6, 0), (-(10 ** 6), -(10 ** 6))] + [
+        (rng.uniform(-50000, 50000), rng.uniform(-50000, 50000)) for _ in range(500)
+    ]
+    closest, closest_xs, closest_ys, found = index.closest_many(*zip(*points))
+    assert found.all()
+    for (x, y), celestial_body, body_x, body_y in zip(
+        points, closest, closest_xs, closest_ys
+    ):
+        assert celestial_body is index.closest(x, y)
+        assert (body_x, body_y) == (celestial_body.x, celestial_body.y)
+
+
+def test_closest_many_without_bodies():
+    closest, _, _, found = CelestialBodyIndex().closest_many([0, 1], [0, 1])
+    assert closest.tolist() == [None, None]
+    assert not found.any()
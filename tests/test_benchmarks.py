@@ -0,0 +1,44 @@
+import unittest
+
+import pytest
+
+from benchmarks import BENCHMARKS, benchmark, compare, regressions, run_benchmarks
+
+
+def test_compare_and_regressions():
+    baseline = {"fast": {"min": 1.0}, "slow": {"min": 1.0}, "gone": {"min": 1.0}}
+    results = {"fast": {"min": 0.5}, "slow": {"min": 1.5}, "new": {"min": 1.0}}
+    comparison = compare(baseline, results)
+    assert [entry[0] for entry in comparison] == ["fast", "slow"]
+    assert [entry[0] for entry in regressions(comparison, 0.1)] == ["slow"]
+    assert regressions(comparison, 0.6) == []
+
+
+def test_run_benchmarks():
+    calls = []
+
+    @benchmark("test_benchmark", repeat=3)
+    def setup():
+        return lambda: calls.append(1)
+
+    try:
+        results = run_benchmarks("test_benchmark")
+    finally:
+        del BENCHMARKS["test_benchmark"]
+    assert list(results) == ["test_benchmark"]
+    assert len(calls) == 3
+    assert results["test_benchmark"]["min"] <= results["test_benchmark"]["median"]
+
+
+def test_teardown_runs_after_timing():
+    calls = []
+
+    @benchmark("test_benchmark", repeat=2)
+    def setup():
+        return lambda: calls.append("operation"), lambda: calls.append("teardown")
+
+    try:
+        run_benchmarks("test_benchmark")
+    finally:
+        del BENCHMARKS["test_benchmark"]
+    assert calls == ["operation", "teardown"] * 2
@@ -0,0 +1,94 @@
+import unittest
+
+import pytest
+
+from abbot import physics, settings
+from abbot.driver import Driver
+from abbot.npc import NPC
+
+
+@pytest.fixture
+def driver():
+    driver = Driver(seed=1)
+    yield driver
+    driver.close()
+
+
+def test_player_collides_with_celestial_body(driver):
+    celestial_body = driver.galaxy.closest_celestial_body(0, 0)
+    driver.player.body.position = celestial_body.x, celestial_body.y
+    driver.update(1 / 60)
+    assert any(
+        shape.celestial_body is celestial_body for shape in driver.player._collisions
+    )
+
+
+def test_player_collides_with_npc(driver):
+    npc = NPC("kingkrool", x=10 ** 6, y=10 ** 6)
+    driver.player.body.position = npc.x, npc.y
+    driver.add_npc(npc)
+    driver.update(1 / 60)
+    assert npc.shape in driver.player._collisions
+    assert driver.player.shape in npc._collisions
+
+
+def test_attack_sees_current_npc_positions(driver):
+    npc = NPC("kingkrool", x=50, y=0)
+    npc.body.velocity = 6000, 0
+    driver.add_npc(npc)
+    seen = []
+    driver.player.attack = lambda proximity: seen.append(
+        (proximity.xs.tolist(), [npc.x])
+    )
+    driver.do_attack = True
+    driver.update(1 / 60)
+    assert len(seen) == 1
+    assert seen[0][0] == seen[0][1]
+
+
+def rejects(filter_1, filter_2):
+    return (filter_1.categories & filter_2.mask) == 0 or (
+        filter_2.categories & filter_1.mask
+    ) == 0
+
+
+def test_uninteresting_pairs_are_filtered():
+    npc_filter = physics.SHAPE_FILTERS[physics.NPC_COLLISION_TYPE]
+    celestial_body_filter = physics.SHAPE_FILTERS[physics.CELESTIAL_BODY_COLLISION_TYPE]
+    player_filter = physics.SHAPE_FILTERS[physics.PLAYER_COLLISION_TYPE]
+    assert rejects(npc_filter, npc_filter)
+    assert rejects(celestial_body_filter, celestial_body_filter)
+    assert not rejects(npc_filter, celestial_body_filter)
+    assert not rejects(player_filter, npc_filter)
+
+
+def test_gravity_field_pulls_player(monkeypatch):
+    monkeypatch.setattr(settings, "GRAVITY_FIELD", True)
+    driver = Driver(seed=1)
+    try:
+        assert len(driver.gravity_field) == len(
+            driver.galaxy.celestial_body_arrays()[0]
+        )
+        celestial_body = driver.galaxy.closest_celestial_body(0, 0)
+        driver.player.body.position = celestial_body.x + 4000, celestial_body.y
+        driver.update(1 / 60)
+        assert driver.player.body.velocity.x < 0
+    finally:
+        driver.close()
+
+
+def test_prefetched_chunks_unbound_when_player_turns_around():
+    driver = Driver(seed=1, prefetch=True)
+    try:
+        width = driver.galaxy.chunk_width
+        driver.player.body.velocity = width, 0
+        for _ in range(driver.prefetcher.integration_delay + 3):
+            driver.update_active_chunks()
+        assert (2, 0) in driver._chunk_bindings
+        active_chunks = driver.active_chunks
+        driver.player.body.velocity = -width, 0
+        driver.update_active_chunks()
+        assert driver.active_chunks is active_chunks
+        assert not any(chunk_x == 2 for chunk_x, _ in driver._chunk_bindings)
+    finally:
+        driver.close()
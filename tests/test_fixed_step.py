@@ -0,0 +1,69 @@
+import math
+import time
+import unittest
+
+import pytest
+
+from abbot.driver import Driver
+from abbot.fixed_step import FixedStepSimulation, interpolate_angle
+from abbot.npc import NPC
+
+TIMESTEP = 1 / 60
+
+
+@pytest.fixture
+def driver():
+    driver = Driver(seed=1)
+    yield driver
+    driver.close()
+
+
+def test_advance_steps_whole_timesteps(driver):
+    simulation = FixedStepSimulation(driver, TIMESTEP)
+    assert simulation.advance(TIMESTEP / 2) == 0
+    assert simulation.advance(TIMESTEP * 0.6) == 1
+    assert simulation.accumulator == pytest.approx(TIMESTEP * 0.1)
+    assert simulation.advance(TIMESTEP * 2) == 2
+    assert simulation.tick == 3
+
+
+def test_advance_drops_backlog_beyond_max_steps(driver):
+    simulation = FixedStepSimulation(driver, TIMESTEP, max_steps=3)
+    assert simulation.advance(1) == 3
+    assert simulation.accumulator < TIMESTEP
+    assert simulation.advance(0) == 0
+
+
+def test_snapshots_are_double_buffered(driver):
+    driver.add_npc(NPC("kingkrool", x=500, y=500))
+    simulation = FixedStepSimulation(driver, TIMESTEP)
+    driver.player.body.velocity = 600, 0
+    simulation.advance(TIMESTEP * 2)
+    previous, current, alpha = simulation.snapshots()
+    assert (previous.tick, current.tick) == (1, 2)
+    assert 0 <= alpha <= 1
+    assert len(current.npc_xs) == 1
+    assert current.npcs == list(driver.npcs)
+    assert current.active_chunks is driver.active_chunks
+    x, _, _ = current.interpolate_player(previous, 0.5)
+    assert x == pytest.approx((previous.player_x + current.player_x) / 2)
+    npc_xs, _, _ = current.interpolate_npcs(previous, 0.5)
+    assert npc_xs[0] == pytest.approx((previous.npc_xs[0] + current.npc_xs[0]) / 2)
+
+
+def test_interpolate_angle_the_short_way():
+    assert interpolate_angle(0.1, -0.1, 0.5) == pytest.approx(0)
+    assert interpolate_angle(math.pi - 0.1, -math.pi + 0.1, 0.5) == pytest.approx(
+        math.pi
+    )
+
+
+def test_threaded_simulation(driver):
+    simulation = FixedStepSimulation(driver, TIMESTEP)
+    simulation.start()
+    assert simulation.threaded
+    time.sleep(TIMESTEP * 6)
+    simulation.stop()
+    assert not simulation.threaded
+    assert simulation.tick >= 1
+    assert simulation.snapshots()[1].tick == simulation.tick
@@ -0,0 +1,81 @@
+import math
+import unittest
+
+import numpy
+import pytest
+
+from abbot.galaxy import Galaxy
+from abbot.gravity import GravityField, SURFACE_GRAVITY, celestial_body_masses
+from abbot.npc import NPC, NPCPopulation
+
+
+def direct_accelerations(field, body_xs, body_ys, radii, xs, ys):
+    dxs = body_xs - numpy.asarray(xs)[:, numpy.newaxis]
+    dys = body_ys - numpy.asarray(ys)[:, numpy.newaxis]
+    squared_distances = numpy.maximum(dxs * dxs + dys * dys, radii ** 2)
+    strengths = (
+        field.gravitational_constant
+        * celestial_body_masses(radii)
+        / squared_distances ** 1.5
+    )
+    return (strengths * dxs).sum(axis=1), (strengths * dys).sum(axis=1)
+
+
+@pytest.fixture
+def bodies():
+    random = numpy.random.default_rng(3)
+    return (
+        random.uniform(-50000, 50000, 200),
+        random.uniform(-50000, 50000, 200),
+        random.uniform(512, 2048, 200),
+    )
+
+
+def test_empty_field_has_no_gravity():
+    assert GravityField().acceleration(10, 20) == (0, 0)
+
+
+def test_surface_gravity():
+    field = GravityField()
+    field.rebuild([0], [0], [1000])
+    acceleration_x, acceleration_y = field.acceleration(0, 1000)
+    assert acceleration_x == 0
+    assert acceleration_y == pytest.approx(-SURFACE_GRAVITY)
+    assert field.acceleration(0, 500)[1] == pytest.approx(-SURFACE_GRAVITY / 2)
+    assert field.acceleration(0, 0) == (0, 0)
+
+
+def test_zero_theta_is_exact(bodies):
+    field = GravityField(theta=0)
+    field.rebuild(*bodies)
+    xs, ys = numpy.linspace(-60000, 60000, 50), numpy.linspace(60000, -40000, 50)
+    expected_xs, expected_ys = direct_accelerations(field, *bodies, xs, ys)
+    acceleration_xs, acceleration_ys = field.accelerations(xs, ys)
+    numpy.testing.assert_allclose(acceleration_xs, expected_xs)
+    numpy.testing.assert_allclose(acceleration_ys, expected_ys)
+
+
+def test_barnes_hut_approximates_direct_sum(bodies):
+    field = GravityField(theta=0.5)
+    field.rebuild(*bodies)
+    xs, ys = numpy.linspace(-60000, 60000, 50), numpy.linspace(60000, -40000, 50)
+    expected_xs, expected_ys = direct_accelerations(field, *bodies, xs, ys)
+    acceleration_xs, acceleration_ys = field.accelerations(xs, ys)
+    errors = numpy.hypot(acceleration_xs - expected_xs, acceleration_ys - expected_ys)
+    assert (errors < 0.05 * numpy.hypot(expected_xs, expected_ys)).all()
+
+
+def test_population_falls_along_gravity_field():
+    galaxy = Galaxy(seed=1)
+    galaxy.update_active_chunks(0, 0)
+    field = GravityField()
+    field.rebuild(*galaxy.celestial_body_arrays())
+    npc = NPC("kingkrool", x=3000, y=-2000)
+    population = NPCPopulation([npc])
+    population.update(galaxy, field, 1 / 60)
+    acceleration_x, acceleration_y = field.acceleration(3000, -2000)
+    assert npc.body.velocity.x == pytest.approx(acceleration_x / 60)
+    assert npc.body.velocity.y == pytest.approx(acceleration_y / 60)
+    assert npc.angle == pytest.approx(
+        math.atan2(-acceleration_y, -acceleration_x) - math.pi / 2
+    )
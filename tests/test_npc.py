@@ -1,17 +1,31 @@
 import unittest
 
+import pymunk
 import pytest
 
-from abbot.npc import NPC
+from abbot.galaxy import Galaxy
+from abbot.npc import ATTACK_DISTANCE, NPC, NPCPopulation
 
 
 def test_npc_attack():
     attacker = NPC("kingkrool")
     defender = NPC("kingkrool")
-    attacker.attack([defender])
+    population = NPCPopulation([defender])
+    population.gather()
+    attacker.attack(population.proximity)
     assert defender.current_hp < defender.hp
 
 
+def test_npc_attack_out_of_range():
+    attacker = NPC("kingkrool")
+    defender = NPC("kingkrool", x=ATTACK_DISTANCE)
+    population = NPCPopulation([attacker, defender])
+    population.gather()
+    attacker.attack(population.proximity)
+    assert defender.current_hp == defender.hp
+    assert attacker.current_hp == attacker.hp
+
+
 def test_npc_fainted():
     npc = NPC("kingkrool")
     npc.current_hp -= npc.current_hp
@@ -21,3 +35,67 @@ def test_npc_fainted():
 def test_npc_updated():
     npc = NPC("kingkrool")
     npc.update(None)
+
+
+def test_npc_population_matches_npc_update():
+    galaxy = Galaxy(seed=1)
+    galaxy.update_active_chunks(0, 0)
+    positions = [(0, 3000), (-2500, 100), (9000, -9000), (20000, 15000)]
+    npcs = [NPC("kingkrool", x=x, y=y) for x, y in positions]
+    population = NPCPopulation([NPC("kingkrool", x=x, y=y) for x, y in positions])
+    for npc in npcs:
+        npc.update(galaxy.closest_celestial_body(npc.x, npc.y))
+    population.update(galaxy)
+    assert len(population) == len(npcs)
+    for npc, population_npc in zip(npcs, population):
+        assert population_npc.angle == pytest.approx(npc.angle)
+        assert population_npc.body.velocity.x == pytest.approx(npc.body.velocity.x)
+        assert population_npc.body.velocity.y == pytest.approx(npc.body.velocity.y)
+
+
+def test_npc_population_without_celestial_bodies():
+    population = NPCPopulation([NPC("kingkrool")])
+    population.update(Galaxy(seed=1))
+    assert population[0].angle == 0
+    assert population[0].body.velocity == (0, 0)
+
+
+def test_npc_collisions_are_reused():
+    npc = NPC("kingkrool")
+    ground = pymunk.Circle(pymunk.Body(body_type=pymunk.Body.STATIC), 100)
+    npc.add_collision(ground, pymunk.Vec2d(0, 1))
+    collision = npc._collisions[ground]
+    npc.add_collision(ground, pymunk.Vec2d(0, -1))
+    assert len(npc._collisions) == 1
+    assert collision.normal == (0, -1)
+    npc.remove_collision(ground)
+    npc.remove_collision(ground)
+    assert not npc._collisions
+    npc.add_collision(ground, pymunk.Vec2d(0, 1))
+    assert npc._collisions[ground] is collision
+
+
+def test_npc_collision_contact_point_set():
+    npc = NPC("kingkrool", y=50)
+    ground = pymunk.Circle(pymunk.Body(body_type=pymunk.Body.STATIC), 100)
+    npc.add_collision(ground, pymunk.Vec2d(0, -1))
+    assert len(npc._collisions[ground].contact_point_set.points) == 1
+
+
+def test_npc_jump_when_colliding():
+    npc = NPC("kingkrool")
+    ground = pymunk.Circle(pymunk.Body(body_type=pymunk.Body.STATIC), 100)
+    npc.add_collision(ground, pymunk.Vec2d(0, -1))
+    npc.jump()
+    assert npc.body.velocity.y > 0
+
+
+def test_npc_population_keeps_masses_aligned():
+    npcs = [NPC("kingkrool", x=i) for i in range(3)]
+    for mass, npc in enumerate(npcs, 1):
+        npc.body.mass = mass
+    population = NPCPopulation(npcs[:2])
+    population.add(npcs[2])
+    population.remove(npcs[0])
+    assert list(population) == npcs[1:]
+    assert population.masses.tolist() == [2, 3]
@@ -0,0 +1,28 @@
+import unittest
+
+import pymunk
+import pytest
+
+from abbot import physics
+from abbot.galaxy import CelestialBody
+
+
+def test_celestial_body_shapes_are_reused():
+    space = pymunk.Space()
+    pool = physics.CelestialBodyShapePool(space)
+    shapes = pool.add([CelestialBody(0, 0, 512), CelestialBody(5000, 0, 1024)])
+    assert len(space.shapes) == 2
+    assert shapes[1].celestial_body.x == 5000
+    pool.remove(shapes)
+    assert len(space.shapes) == 0
+    assert len(pool) == 2
+
+    celestial_body = CelestialBody(-3000, 7000, 2048)
+    (shape,) = pool.add([celestial_body])
+    assert shape in shapes
+    assert shape.body is space.static_body
+    assert shape.offset == (-3000, 7000)
+    assert shape.radius == 2048
+    assert shape.celestial_body is celestial_body
+    assert shape.collision_type == physics.CELESTIAL_BODY_COLLISION_TYPE
+    assert space.point_query_nearest((-3000, 7000 + 2000), 0, pymunk.ShapeFilter())
@@ -0,0 +1,36 @@
+import json
+import unittest
+
+import pytest
+
+from abbot.profiling import FrameProfiler
+
+
+def test_profiler_percentiles():
+    profiler = FrameProfiler()
+    for milliseconds in range(1, 101):
+        profiler.record("phase", milliseconds / 1000)
+    p50, p95, p99 = profiler.percentiles("phase")
+    assert p50 == pytest.approx(0.0505)
+    assert p95 == pytest.approx(0.09505)
+    assert p99 == pytest.approx(0.09901)
+    assert profiler.percentiles("missing") == [0, 0, 0]
+
+
+def test_profiler_ring_buffer():
+    profiler = FrameProfiler(capacity=10)
+    for _ in range(100):
+        profiler.start()
+        profiler.lap("phase")
+    assert len(profiler.timings["phase"]) == 10
+
+
+def test_profiler_dump(tmp_path):
+    profiler = FrameProfiler()
+    profiler.record("phase", 0.001)
+    path = tmp_path / "frame_timings.json"
+    profiler.dump(path)
+    dumped = json.loads(path.read_text())
+    assert dumped["summary"]["phase"]["p99"] == pytest.approx(0.001)
+    assert dumped["samples"]["phase"] == [0.001]
+    assert "phase" in str(profiler)
@@ -0,0 +1,36 @@
+import random
+import unittest
+
+import pytest
+
+from abbot.proximity import ProximityIndex
+
+
+@pytest.fixture
+def points():
+    rng = random.Random(0)
+    return [(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for _ in range(500)]
+
+
+@pytest.fixture
+def index(points):
+    index = ProximityIndex(cell_size=64)
+    index.rebuild(range(len(points)), *zip(*points))
+    return index
+
+
+def test_query_radius_matches_linear_scan(points, index):
+    for x, y, radius in [(0, 0, 100), (500, -300, 250), (-999, 999, 50), (0, 0, 5000)]:
+        expected = [
+            i
+            for i, (point_x, point_y) in enumerate(points)
+            if (point_x - x) ** 2 + (point_y - y) ** 2 < radius ** 2
+        ]
+        assert index.query_radius(x, y, radius) == expected
+
+
+def test_query_radius_empty():
+    index = ProximityIndex()
+    assert index.query_radius(0, 0, 100) == []
+    index.rebuild([], [], [])
+    assert index.query_radius(0, 0, 100) == []
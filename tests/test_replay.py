@@ -0,0 +1,97 @@
+import unittest
+
+import pytest
+
+from abbot.driver import Driver
+from abbot.replay import HEADER, ReplayLog, replay
+from abbot.sim import RandomInput, run
+
+
+def record(path, ticks=240, timestep=1 / 60):
+    driver = Driver(seed=1)
+    driver.record(path, hash_interval=10)
+    run(driver, ticks, timestep, RandomInput(seed=2, change_probability=0.2))
+    driver.close()
+    return ReplayLog.from_file(path)
+
+
+def test_replay_reproduces_recording(tmp_path):
+    log = record(tmp_path / "session.rpl")
+    assert log.seed == 1
+    assert len(log.data) == HEADER.size + 240 + 24 * 8
+    driver = Driver(log.seed)
+    try:
+        ticks, elapsed, diverged_tick = replay(driver, log)
+    finally:
+        driver.close()
+    assert ticks == 240
+    assert diverged_tick is None
+
+
+def test_replay_reproduces_recording_across_prefetched_chunks(tmp_path):
+    path = tmp_path / "session.rpl"
+
+    def launch(driver):
+        driver.player.body.velocity = 0, 2 * driver.galaxy.chunk_width
+
+    driver = Driver(seed=1, prefetch=True)
+    start = driver.galaxy.position_to_chunk_coordinates(
+        driver.player.x, driver.player.y
+    )
+    launch(driver)
+    driver.record(path, hash_interval=1)
+    run(driver, 240, input_source=RandomInput(seed=2, change_probability=0.2))
+    end = driver.galaxy.position_to_chunk_coordinates(driver.player.x, driver.player.y)
+    driver.close()
+    assert end != start
+
+    driver = Driver(seed=1, prefetch=True)
+    launch(driver)
+    try:
+        _, _, diverged_tick = replay(driver, ReplayLog.from_file(path))
+    finally:
+        driver.close()
+    assert diverged_tick is None
+
+
+def test_replay_detects_divergence(tmp_path):
+    log = record(tmp_path / "session.rpl")
+    driver = Driver(log.seed)
+    driver.player.body.position = 0, 3000
+    try:
+        _, _, diverged_tick = replay(driver, log)
+    finally:
+        driver.close()
+    assert diverged_tick == 10
+
+
+def test_replay_log_timestep_changes_and_truncation(tmp_path):
+    path = tmp_path / "session.rpl"
+    driver = Driver(seed=1)
+    driver.record(path, hash_interval=0)
+    driver.update(1 / 60)
+    driver.do_jump = True
+    driver.update(1 / 30)
+    driver.close()
+    log = ReplayLog.from_file(path)
+    assert list(log) == [(0, 1 / 60, None), (0x88, 1 / 30, None)]
+    assert list(ReplayLog(log.data[:-1])) == [(0, 1 / 60, None)]
+
+
+def test_recording_starts_before_first_update(tmp_path):
+    driver = Driver(seed=1)
+    try:
+        driver.update(1 / 60)
+        with pytest.raises(ValueError):
+            driver.record(tmp_path / "session.rpl")
+    finally:
+        driver.close()
+
+
+def test_replay_log_negative_seed(tmp_path):
+    path = tmp_path / "session.rpl"
+    driver = Driver(seed=-5, prefetch=False)
+    driver.record(path)
+    driver.update(1 / 60)
+    driver.close()
+    assert ReplayLog.from_file(path).seed == -5
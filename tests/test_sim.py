@@ -0,0 +1,41 @@
+import sys
+import unittest
+
+import pytest
+
+from abbot.driver import Driver
+from abbot.sim import RandomInput, ScriptedInput, main, run
+
+
+@pytest.fixture
+def driver():
+    driver = Driver(seed=1)
+    yield driver
+    driver.close()
+
+
+def test_run_random_input(driver):
+    elapsed = run(driver, 120, input_source=RandomInput(seed=0))
+    assert elapsed > 0
+
+
+def test_scripted_input(driver):
+    input_source = ScriptedInput(["# move right", "0 right", "", "10 stop"])
+    run(driver, 5, input_source=input_source)
+    assert driver.moving_right
+    run(driver, 1, input_source=ScriptedInput(["0 stop"]))
+    assert not driver.moving_right
+
+
+def test_scripted_input_rejects_unknown_commands():
+    with pytest.raises(ValueError):
+        ScriptedInput(["0 fly"])
+
+
+def test_main_rejects_recording_a_restored_run(monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys, "argv", ["sim", "--restore", "a.snap", "--record", "a.rpl"]
+    )
+    with pytest.raises(SystemExit):
+        main()
+    assert "--record cannot be combined with --restore" in capsys.readouterr().err
@@ -0,0 +1,143 @@
+import math
+import time
+
+import numpy
+import pytest
+
+from abbot import snapshot
+from abbot.driver import Driver
+from abbot.npc import NPC
+from abbot.replay import state_hash
+from abbot.sim import RandomInput, run
+
+
+@pytest.fixture
+def driver():
+    driver = Driver(seed=1)
+    driver.add_npcs(
+        [
+            NPC("kingkrool", x=3000 * math.cos(angle), y=3000 * math.sin(angle))
+            for angle in range(20)
+        ]
+    )
+    run(driver, 60, input_source=RandomInput(seed=2, change_probability=0.2))
+    yield driver
+    driver.close()
+
+
+def test_restore_matches_saved_state(driver):
+    npc = driver.npcs[3]
+    npc.current_hp = 0
+    npc._sprite.set_animation("attack", False)
+    npc._sprite.current_frame = 5
+    npc.non_looped_frames_remaining = 7
+    driver.moving_right = True
+    restored = snapshot.restore(snapshot.save(driver))
+    try:
+        assert restored.galaxy.seed == driver.galaxy.seed
+        assert restored.ticks == driver.ticks
+        assert restored.moving_right
+        assert len(restored.npcs) == len(driver.npcs)
+        assert state_hash(restored) == state_hash(driver)
+        restored_npc = restored.npcs[3]
+        assert restored_npc.current_hp == 0
+        assert restored_npc._sprite.current_animation_name == "attack"
+        assert restored_npc._sprite.current_frame == 5
+        assert not restored_npc._sprite.loop
+        assert restored_npc.non_looped_frames_remaining == 7
+        assert len(restored.space.bodies) == len(driver.space.bodies)
+    finally:
+        restored.close()
+
+
+def test_restored_run_follows_original_without_contacts():
+    # contacts that begin after the restore are found alike by both spaces
+    driver = Driver(seed=1)
+    body = driver.galaxy.closest_celestial_body(0, 0)
+    driver.player.body.position = body.x, body.y + body.radius + 1000
+    driver.add_npc(NPC("kingkrool", x=body.x + 500, y=body.y + body.radius + 1000))
+    driver.update(1 / 60)
+    restored = snapshot.restore(snapshot.save(driver))
+    try:
+        run(driver, 60, input_source=RandomInput(seed=3, change_probability=0.2))
+        run(restored, 60, input_source=RandomInput(seed=3, change_probability=0.2))
+        assert state_hash(restored) == state_hash(driver)
+    finally:
+        driver.close()
+        restored.close()
+
+
+def test_restore_activates_chunks_around_restored_player():
+    driver = Driver(seed=1, prefetch=False)
+    driver.player.body.position = 10 * driver.galaxy.chunk_width, 0
+    data = snapshot.save(driver)
+    driver.close()
+    restored = snapshot.restore(data)
+    try:
+        assert (0, 0) not in restored.galaxy.chunk_cache
+        assert (10, 0) in restored.galaxy.chunk_cache
+        assert restored.galaxy.chunk_cache.stats.misses == 9
+    finally:
+        restored.close()
+
+
+def test_restore_negative_seed():
+    driver = Driver(seed=-5, prefetch=False)
+    data = snapshot.save(driver)
+    driver.close()
+    restored = snapshot.restore(data)
+    try:
+        assert restored.galaxy.seed == -5
+    finally:
+        restored.close()
+
+
+def test_restore_modified_chunks(driver):
+    chunk = driver.active_chunks[0]
+    modified = driver.galaxy.chunk_from_arrays(
+        chunk.chunk_x,
+        chunk.chunk_y,
+        chunk.xs + 1,
+        chunk.ys,
+        numpy.full(len(chunk.radii), 1000.0),
+    )
+    driver.galaxy.mark_modified(modified)
+    restored = snapshot.restore(snapshot.save(driver))
+    try:
+        restored_chunk = restored.galaxy.chunk_from_chunk_coordinates(
+            chunk.chunk_x, chunk.chunk_y
+        )
+        assert (
+            restored_chunk
+            is restored.galaxy.modified_chunks[(chunk.chunk_x, chunk.chunk_y)]
+        )
+        assert restored_chunk.xs.tolist() == modified.xs.tolist()
+        assert restored_chunk.radii.tolist() == modified.radii.tolist()
+        assert restored_chunk in restored.active_chunks
+    finally:
+        restored.close()
+
+
+def test_restore_rejects_other_formats_and_versions(driver):
+    data = snapshot.save(driver)
+    with pytest.raises(ValueError):
+        snapshot.restore(b"ABRP" + data[4:])
+    version = snapshot.VERSION + 1
+    with pytest.raises(ValueError):
+        snapshot.restore(data[:4] + version.to_bytes(2, "little") + data[6:])
+
+
+def test_restore_many_npcs_quickly(tmp_path):
+    driver = Driver(seed=1)
+    driver.add_npcs(
+        [NPC("kingkrool", x=10 * i, y=3000 + 10 * (i % 7)) for i in range(1000)]
+    )
+    path = tmp_path / "heavy.snap"
+    snapshot.save_file(driver, path)
+    driver.close()
+    start = time.perf_counter()
+    restored = snapshot.restore_file(path)
+    elapsed = time.perf_counter() - start
+    restored.close()
+    assert len(restored.npcs) == 1000
+    assert elapsed < 1
@@ -0,0 +1,56 @@
+import io
+import threading
+import unittest
+
+import pytest
+
+from abbot import settings, trace
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    yield stream
+    trace.configure(settings.TRACE)
+
+
+def test_disabled_categories_are_dropped(stream):
+    trace.configure("physics:warning", stream)
+    trace.event(trace.PHYSICS, trace.DEBUG, "dropped")
+    trace.event(trace.GALAXY, trace.ERROR, "dropped")
+    trace.flush()
+    assert stream.getvalue() == ""
+    assert not trace.enabled(trace.PHYSICS, trace.INFO)
+    assert trace.enabled(trace.PHYSICS, trace.ERROR)
+
+
+def test_enabled_events_are_written(stream):
+    trace.configure("physics:debug, galaxy", stream)
+    for i in range(100):
+        trace.event(trace.PHYSICS, trace.DEBUG, "collision %d", i)
+    trace.event(trace.GALAXY, trace.INFO, "Added %s", "chunk")
+    trace.flush()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 101
+    assert lines[0].endswith("DEBUG physics: collision 0")
+    assert lines[-1].endswith("INFO galaxy: Added chunk")
+
+
+def test_reconfigure_reuses_writer_thread(stream):
+    for _ in range(3):
+        trace.configure("physics:debug", stream)
+        trace.event(trace.PHYSICS, trace.DEBUG, "event")
+        trace.flush()
+    writers = [t for t in threading.enumerate() if t.name == "trace-writer"]
+    assert len(writers) == 1
+    other_stream = io.StringIO()
+    trace.configure("physics:debug", other_stream)
+    trace.event(trace.PHYSICS, trace.DEBUG, "moved")
+    trace.flush()
+    assert stream.getvalue().count("event") == 3
+    assert other_stream.getvalue().endswith("DEBUG physics: moved\n")
+
+
+def test_configure_rejects_unknown_levels():
+    with pytest.raises(KeyError):
+        trace.configure("physics:loud")
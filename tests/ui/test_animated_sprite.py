@@ -0,0 +1,38 @@
+import unittest
+
+import pytest
+
+from abbot.ui.animated_sprite import (
+    LEFT_FACING,
+    RIGHT_FACING,
+    UPDATES_PER_FRAME,
+    AnimatedSprite,
+    texture_registry,
+)
+
+
+def test_textures_load_lazily():
+    texture_registry.clear()
+    AnimatedSprite("kingkrool")
+    assert len(texture_registry) == 1
+
+
+def test_textures_are_shared():
+    sprite_1 = AnimatedSprite("kingkrool")
+    sprite_2 = AnimatedSprite("kingkrool")
+    assert sprite_1.texture is sprite_2.texture
+
+
+def test_texture_registry_keys_on_facing():
+    right = texture_registry.texture("kingkrool", "walk", 1, RIGHT_FACING)
+    left = texture_registry.texture("kingkrool", "walk", 1, LEFT_FACING)
+    assert right is not left
+    assert right is texture_registry.texture("kingkrool", "walk", 1, RIGHT_FACING)
+
+
+def test_animation_total_frames():
+    sprite = AnimatedSprite("kingkrool")
+    sprite.set_animation("walk")
+    assert sprite.get_current_animation_total_frames() == 8 * UPDATES_PER_FRAME
+    for _ in range(100):
+        sprite.update()
@@ -0,0 +1,53 @@
+import unittest
+
+import pytest
+
+from abbot.galaxy import Galaxy
+from abbot.ui.chunk_renderer import ChunkRenderer, far_field_zoom
+
+
+@pytest.fixture
+def galaxy():
+    return Galaxy(seed=0)
+
+
+def test_chunk_renderer_tracks_active_chunks(galaxy):
+    renderer = ChunkRenderer()
+    renderer.update(galaxy.update_active_chunks(0, 0))
+    assert len(renderer) == 9
+    renderer.update(galaxy.update_active_chunks(10 * galaxy.chunk_width, 0))
+    assert len(renderer) == 9
+    assert (0, 0) not in renderer._chunk_batches
+    assert (10, 0) in renderer._chunk_batches
+
+
+def test_chunk_bounds_contain_celestial_bodies(galaxy):
+    chunk = galaxy.chunk_from_chunk_coordinates(0, 0)
+    left, bottom, right, top = ChunkRenderer.chunk_bounds(chunk)
+    for celestial_body in chunk.celestial_bodies:
+        assert left <= celestial_body.x - celestial_body.radius
+        assert right >= celestial_body.x + celestial_body.radius
+        assert bottom <= celestial_body.y - celestial_body.radius
+        assert top >= celestial_body.y + celestial_body.radius
+
+
+def test_chunk_renderer_tracks_far_field_chunks(galaxy):
+    renderer = ChunkRenderer()
+    galaxy.update_active_chunks(0, 0)
+    renderer.update(galaxy.far_field_chunks)
+    assert len(renderer) == len(galaxy.far_field_chunks)
+
+
+def test_chunk_renderer_tracks_several_chunk_lists(galaxy):
+    renderer = ChunkRenderer()
+    galaxy.update_active_chunks(0, 0)
+    renderer.update(galaxy.far_field_chunks, galaxy.active_chunks)
+    assert len(renderer) == 7 * 7
+    renderer.update(galaxy.far_field_chunks)
+    assert (0, 0) not in renderer._chunk_batches
+    assert len(renderer) == 7 * 7 - 9
+
+
+def test_far_field_zoom_fits_far_field_on_screen(galaxy):
+    zoom = far_field_zoom(galaxy, 1280, 1024)
+    assert 1024 * zoom == (2 * galaxy.far_field_radius + 1) * galaxy.chunk_width
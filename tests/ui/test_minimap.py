@@ -0,0 +1,100 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+import arcade
+import numpy
+import pytest
+
+from abbot.galaxy import Chunk
+from abbot.ui.minimap import (
+    BACKGROUND_COLOR,
+    CELESTIAL_BODY_COLOR,
+    TILE_CHUNKS,
+    TILE_PIXELS,
+    MinimapOverlay,
+    MinimapTiles,
+    render_tile,
+)
+
+SEED = 5
+CHUNK_WIDTH = 2 ** 14
+
+
+def test_render_tile_plots_chunk_celestial_bodies():
+    pixels = numpy.asarray(render_tile(SEED, CHUNK_WIDTH, 0, -1, 0))
+    assert pixels.shape == (TILE_PIXELS, TILE_PIXELS, 4)
+    pixel_width = TILE_CHUNKS * CHUNK_WIDTH / TILE_PIXELS
+    for chunk_x, chunk_y in [(-TILE_CHUNKS + 3, 5), (-7, TILE_CHUNKS - 9)]:
+        (celestial_body,) = Chunk(SEED, chunk_x, chunk_y, CHUNK_WIDTH).celestial_bodies
+        column = int((celestial_body.x + TILE_CHUNKS * CHUNK_WIDTH) // pixel_width)
+        row = TILE_PIXELS - 1 - int(celestial_body.y // pixel_width)
+        assert tuple(pixels[row, column]) == CELESTIAL_BODY_COLOR
+    assert tuple(pixels[0, 0]) in (BACKGROUND_COLOR, CELESTIAL_BODY_COLOR)
+
+
+def test_tiles_stream_in_around_position():
+    tiles = MinimapTiles(SEED, CHUNK_WIDTH, max_tiles=12)
+    try:
+        x = y = tiles.tile_width(1) * 10.5
+        visible = tiles.visible_tile_coordinates(x, y, 1)
+        assert visible[4] == (1, 10, 10)
+        deadline = time.time() + 10
+        while len(tiles) < 9 and time.time() < deadline:
+            tiles.update(x, y, 1)
+            time.sleep(0.01)
+        assert all(tiles.tile(*tile) is not None for tile in visible)
+        tiles.update(-x, -y, 1)
+        deadline = time.time() + 10
+        while len(tiles) < 12 and time.time() < deadline:
+            tiles.update(-x, -y, 1)
+            time.sleep(0.01)
+        assert len(tiles) == 12
+        assert all(tiles.tile(*tile) is not None for tile in visible[-3:])
+    finally:
+        tiles.shutdown()
+
+
+class FakeSpriteList(list):
+    """ Sprite slots without a GL context, recording atlas updates """
+
+    def __init__(self):
+        super().__init__(SimpleNamespace(texture=SimpleNamespace()) for _ in range(9))
+        self.updated = []
+        self.atlas = SimpleNamespace(update_texture_image=self.updated.append)
+
+    def draw(self):
+        pass
+
+
+def wait_for_tiles(tiles, x, y, zoom):
+    deadline = time.time() + 10
+    visible = tiles.visible_tile_coordinates(x, y, zoom)
+    while time.time() < deadline:
+        tiles.update(x, y, zoom)
+        if all(tiles.tile(*tile) is not None for tile in visible):
+            return
+        time.sleep(0.01)
+
+
+def test_overlay_redraws_slots_for_new_tiles(monkeypatch):
+    monkeypatch.setattr(arcade, "draw_point", lambda *args: None)
+    tiles = MinimapTiles(SEED, CHUNK_WIDTH)
+    other_tiles = MinimapTiles(SEED + 1, CHUNK_WIDTH)
+    try:
+        overlay = MinimapOverlay(tiles)
+        overlay._sprite_list = sprite_list = FakeSpriteList()
+        wait_for_tiles(tiles, 0, 0, 0)
+        overlay.draw(0, 0, 0, 400, 400)
+        assert all(ready for _, ready in overlay._slot_tiles)
+        wait_for_tiles(other_tiles, 0, 0, 0)
+        overlay.set_tiles(other_tiles)
+        sprite_list.updated.clear()
+        overlay.draw(0, 0, 0, 400, 400)
+        assert len(sprite_list.updated) == 9
+        visible = other_tiles.visible_tile_coordinates(0, 0, 0)
+        for sprite, tile in zip(sprite_list, visible):
+            assert sprite.texture.image is other_tiles.tile(*tile)
+    finally:
+        tiles.shutdown()
+        other_tiles.shutdown()